@@ -0,0 +1,11 @@
+"""
+Shared Router Dependencies
+"""
+from fastapi import Request
+
+from database.connection import Database
+
+
+def get_db(request: Request) -> Database:
+    """Database opened by the app lifespan"""
+    return request.app.state.db
@@ -7,20 +7,30 @@ Handles:
 - Managing streaks
 """
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict
+from typing import Dict, Any, Iterator, List, Optional
 from datetime import datetime
+import bisect
+import threading
+
+import orjson
+from cachetools import LRUCache
 
 from services.feature_extraction import extract_body_features
 from services.pathway_generator import generate_pathway
+from database.pathway_store import pathway_store, LOCAL_MAX_PATHWAYS
+from utils.landmarks import LandmarkArray
 
 router = APIRouter()
 
 
 class PathwayRequest(BaseModel):
-    front_pose: List[Dict[str, float]]
-    side_pose: List[Dict[str, float]]
+    model_config = ConfigDict(extra='ignore')
+
+    front_pose: LandmarkArray
+    side_pose: LandmarkArray
     gender: str = 'male'
     age: Optional[int] = 25
     height: Optional[int] = 175
@@ -33,13 +43,42 @@ class StageCompleteRequest(BaseModel):
     task_id: str
 
 
-# In-memory storage for MVP (replace with database later)
-pathways_db = {}
-user_progress_db = {}
+# League tiers by minimum total XP (must stay sorted)
+LEAGUE_THRESHOLDS = (0, 500, 1000, 2500, 5000)
+LEAGUE_NAMES = ('bronze', 'silver', 'gold', 'platinum', 'diamond')
+
+
+# Per-pathway lookup tables, kept outside the pathway so they are never serialized
+pathway_indexes = LRUCache(maxsize=LOCAL_MAX_PATHWAYS)
+# cachetools caches are not thread-safe (even get reorders the LRU) and handlers run on a threadpool
+pathway_indexes_lock = threading.Lock()
+
+
+def build_pathway_index(pathway: Dict[str, Any]) -> Dict[str, Any]:
+    """Index a pathway's stages by day and tasks by id, with pending-task counts per stage."""
+    return {
+        'stages': {s['day']: s for s in pathway['stages']},
+        'tasks': {t['id']: (s, t) for s in pathway['stages'] for t in s['tasks']},
+        'pending': {s['day']: sum(not t['completed'] for t in s['tasks']) for s in pathway['stages']},
+    }
+
+
+def get_pathway_index(pathway: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the lookup index for a pathway, reusing it while the store hands out the same object."""
+    with pathway_indexes_lock:
+        cached = pathway_indexes.get(pathway['id'])
+    if cached is not None and cached[0] is pathway:
+        return cached[1]
+    
+    index = build_pathway_index(pathway)
+    if pathway_store.is_local:
+        with pathway_indexes_lock:
+            pathway_indexes[pathway['id']] = (pathway, index)
+    return index
 
 
 @router.post("/generate-pathway")
-async def generate_user_pathway(request: PathwayRequest):
+def generate_user_pathway(request: PathwayRequest):
     """
     Generate a personalized Duolingo-style pathway based on body analysis.
     """
@@ -67,11 +106,8 @@ async def generate_user_pathway(request: PathwayRequest):
             commitment_days=request.commitment_days
         )
         
-        # Store pathway (in-memory for MVP)
-        pathways_db[pathway['id']] = pathway
-        
         # Initialize user progress
-        user_progress_db['demo_user'] = {
+        progress = {
             'current_pathway': pathway['id'],
             'current_day': 1,
             'streak': 0,
@@ -80,50 +116,58 @@ async def generate_user_pathway(request: PathwayRequest):
             'league': 'bronze',
         }
         
-        return {
+        # Store pathway and progress together
+        pathway_store.save_pathway_and_progress(pathway, 'demo_user', progress)
+        
+        # Returned as a response so FastAPI skips its jsonable_encoder pass over the pathway
+        return ORJSONResponse({
             'success': True,
             'pathway': pathway,
             'features': features,
-            'user_progress': user_progress_db['demo_user'],
-        }
+            'user_progress': progress,
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Pathway generation failed: {str(e)}")
 
 
 @router.post("/complete-task")
-async def complete_task(request: StageCompleteRequest):
+def complete_task(request: StageCompleteRequest):
     """Mark a task as completed and update user progress."""
-    try:
-        pathway = pathways_db.get(request.pathway_id)
+    now_iso = datetime.now().isoformat()
+    
+    def apply(pathway: Optional[Dict[str, Any]], progress: Dict[str, Any]) -> Dict[str, Any]:
         if not pathway:
             raise HTTPException(status_code=404, detail="Pathway not found")
         
+        index = get_pathway_index(pathway)
+        
         # Find the stage and task
-        stage = next((s for s in pathway['stages'] if s['day'] == request.stage_day), None)
+        stage = index['stages'].get(request.stage_day)
         if not stage:
             raise HTTPException(status_code=404, detail="Stage not found")
         
-        task = next((t for t in stage['tasks'] if t['id'] == request.task_id), None)
-        if not task:
+        task_stage, task = index['tasks'].get(request.task_id, (None, None))
+        if task_stage is not stage:
             raise HTTPException(status_code=404, detail="Task not found")
         
         # Mark task as completed
-        task['completed'] = True
+        if not task['completed']:
+            task['completed'] = True
+            index['pending'][request.stage_day] -= 1
         
         # Update user progress
-        progress = user_progress_db.get('demo_user', {})
         progress['total_xp'] = progress.get('total_xp', 0) + task['xp']
         
         # Check if all tasks in stage are complete
-        all_complete = all(t['completed'] for t in stage['tasks'])
+        all_complete = index['pending'][request.stage_day] == 0
         if all_complete:
             stage['completed'] = True
-            stage['completed_at'] = datetime.now().isoformat()
+            stage['completed_at'] = now_iso
             
             # Update streak
             progress['streak'] = progress.get('streak', 0) + 1
-            progress['last_activity'] = datetime.now().isoformat()
+            progress['last_activity'] = now_iso
             
             # Check if user can advance to next day
             if progress.get('current_day', 1) == request.stage_day:
@@ -131,26 +175,22 @@ async def complete_task(request: StageCompleteRequest):
         
         # Update league based on XP
         total_xp = progress.get('total_xp', 0)
-        if total_xp >= 5000:
-            progress['league'] = 'diamond'
-        elif total_xp >= 2500:
-            progress['league'] = 'platinum'
-        elif total_xp >= 1000:
-            progress['league'] = 'gold'
-        elif total_xp >= 500:
-            progress['league'] = 'silver'
-        else:
-            progress['league'] = 'bronze'
-        
-        user_progress_db['demo_user'] = progress
+        progress['league'] = LEAGUE_NAMES[bisect.bisect_right(LEAGUE_THRESHOLDS, total_xp) - 1]
         
         return {
             'success': True,
             'task_completed': True,
             'stage_completed': all_complete,
             'xp_earned': task['xp'],
-            'progress': progress,
+            # Snapshot, since later completions update the stored object in place
+            'progress': dict(progress),
         }
+    
+    try:
+        # Handlers run on a threadpool and may run in several workers; the store applies
+        # the whole check-and-update atomically so completions never double-count a task
+        # or lose XP, and persists both objects in one write
+        return pathway_store.update_pathway_and_progress(request.pathway_id, 'demo_user', apply)
         
     except HTTPException:
         raise
@@ -159,26 +199,52 @@ async def complete_task(request: StageCompleteRequest):
 
 
 @router.get("/pathway/{pathway_id}")
-async def get_pathway(pathway_id: str):
+def get_pathway(pathway_id: str):
     """Get a pathway by ID."""
-    pathway = pathways_db.get(pathway_id)
-    if not pathway:
+    pathway_json = pathway_store.get_pathway_json(pathway_id)
+    if pathway_json is None:
         raise HTTPException(status_code=404, detail="Pathway not found")
     
-    return {
-        'pathway': pathway,
-        'progress': user_progress_db.get('demo_user', {}),
-    }
+    # Splice the stored JSON instead of decoding and re-encoding the whole pathway
+    progress_json = pathway_store.get_progress_json('demo_user') or b'{}'
+    return Response(
+        content=b'{"pathway":' + pathway_json + b',"progress":' + progress_json + b'}',
+        media_type='application/json',
+    )
+
+
+def _stream_stages(stages: List[Dict[str, Any]]) -> Iterator[bytes]:
+    """Encode stages as one JSON array, one chunk per stage"""
+    yield b'['
+    for i, stage in enumerate(stages):
+        yield (b',' if i else b'') + orjson.dumps(stage)
+    yield b']'
+
+
+@router.get("/pathway/{pathway_id}/stages")
+def get_pathway_stages(pathway_id: str):
+    """Get a pathway's stages, streamed one stage at a time."""
+    pathway = pathway_store.get_pathway(pathway_id)
+    if pathway is None:
+        raise HTTPException(status_code=404, detail="Pathway not found")
+    
+    # Long commitments are sent stage by stage instead of as one encoded buffer
+    return StreamingResponse(_stream_stages(pathway['stages']), media_type='application/json')
+
+
+DEFAULT_PROGRESS_JSON = orjson.dumps({
+    'current_pathway': None,
+    'current_day': 1,
+    'streak': 0,
+    'total_xp': 0,
+    'league': 'bronze',
+})
 
 
 @router.get("/user-progress")
-async def get_user_progress():
+def get_user_progress():
     """Get current user progress."""
-    return user_progress_db.get('demo_user', {
-        'current_pathway': None,
-        'current_day': 1,
-        'streak': 0,
-        'total_xp': 0,
-        'league': 'bronze',
-    })
-
+    return Response(
+        content=pathway_store.get_progress_json('demo_user') or DEFAULT_PROGRESS_JSON,
+        media_type='application/json',
+    )
@@ -1,67 +1,74 @@
 """
 Physique Analysis API Router
 """
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict
+from typing import List, Dict, Iterator, Optional
 from datetime import datetime
-import json
+import logging
 
-from services.scoring import score_male_physique, score_female_physique, score_non_binary_physique
-from body_analysis import generate_diet_plan, generate_workout_routine
-from database.connection import db
+import orjson
 
 
-router = APIRouter(prefix="/api", tags=["physique"])
+from services.scoring import score_male_physique
+from services.scoring_placeholders import score_female_physique, score_non_binary_physique
+from body_analysis import generate_diet_plan, generate_workout_routine
+from database.connection import Database
+from api.dependencies import get_db
+from utils.landmarks import LandmarkArray
+
 
+logger = logging.getLogger(__name__)
 
-class PoseLandmark(BaseModel):
-    x: float
-    y: float
-    z: float
-    visibility: float
+router = APIRouter(prefix="/api", tags=["physique"])
 
 
 class TwoPoseAnalyzeRequest(BaseModel):
-    frontPose: List[PoseLandmark]
-    sidePose: List[PoseLandmark]
+    model_config = ConfigDict(extra='ignore')
+
+    frontPose: LandmarkArray
+    sidePose: LandmarkArray
     gender: str
     height: Optional[float] = None
 
 
+# Plain def on purpose: scoring and the SQLite calls below are blocking, so FastAPI runs
+# this handler in its threadpool. If it ever becomes async def, wrap the db.* calls with
+# fastapi.concurrency.run_in_threadpool so they stay off the event loop.
 @router.post("/analyze-physique")
-async def analyze_physique(request: TwoPoseAnalyzeRequest):
+def analyze_physique(request: TwoPoseAnalyzeRequest, db: Database = Depends(get_db)):
     """
     Analyze physique from front and side poses with scoring system
     
     Args:
         request: Contains front pose, side pose, gender, and optional height
+        db: Database opened by the app lifespan
     
     Returns:
         Physique scores (0-100), body type, strong areas, growth areas, and insights
     """
     try:
-        # Convert Pydantic models to dict format
-        front_landmarks = [landmark.dict() for landmark in request.frontPose]
-        side_landmarks = [landmark.dict() for landmark in request.sidePose]
+        front_landmarks = request.frontPose
+        side_landmarks = request.sidePose
         
-        print(f"[DEBUG] Received {len(front_landmarks)} front landmarks, {len(side_landmarks)} side landmarks")
-        print(f"[DEBUG] Gender: {request.gender}, Height: {request.height}")
+        logger.debug("Received %d front landmarks, %d side landmarks", len(front_landmarks), len(side_landmarks))
+        logger.debug("Gender: %s, Height: %s", request.gender, request.height)
         
         # For MVP, use a simple user_id (in production, use proper auth)
         user_id = f"demo_user_{request.gender}"
         
         # Create user if doesn't exist
-        print(f"[DEBUG] Creating/checking user: {user_id}")
+        logger.debug("Creating/checking user: %s", user_id)
         db.create_user(user_id, request.gender, request.height)
         
         # Check if this is user's first scan (baseline)
         baseline_scan = db.get_baseline_scan(user_id)
         is_baseline = baseline_scan is None
-        print(f"[DEBUG] Is baseline: {is_baseline}")
+        logger.debug("Is baseline: %s", is_baseline)
         
         # Route to appropriate scoring function based on gender
-        print(f"[DEBUG] Scoring physique...")
+        logger.debug("Scoring physique...")
         if request.gender == 'male':
             physique_analysis = score_male_physique(
                 front_landmarks,
@@ -83,41 +90,31 @@ async def analyze_physique(request: TwoPoseAnalyzeRequest):
         else:
             raise ValueError(f"Invalid gender: {request.gender}")
         
-        print(f"[DEBUG] Scoring complete. Overall score: {physique_analysis.get('overall_score')}")
+        logger.debug("Scoring complete. Overall score: %s", physique_analysis.get('overall_score'))
         
-        # Save scan to database
-        print(f"[DEBUG] Saving scan to database...")
-        scan_id = db.save_scan(
+        # Save the scan with its baseline metrics or progression in one transaction
+        if is_baseline:
+            days_since = None
+        else:
+            # Calculate days since baseline
+            baseline_date = datetime.fromisoformat(baseline_scan['scan_date'])
+            days_since = (datetime.now() - baseline_date).days
+        
+        logger.debug("Saving scan to database...")
+        scan_id = db.save_scan_bundle(
             user_id,
             front_landmarks,
             side_landmarks,
             physique_analysis,
+            days_since,
             is_baseline=is_baseline
         )
-        print(f"[DEBUG] Scan saved with ID: {scan_id}")
+        logger.debug("Scan saved with ID: %s", scan_id)
         
-        # If this is the baseline scan, save baseline metrics
         if is_baseline:
-            db.save_baseline_metrics(user_id, scan_id, front_landmarks)
             physique_analysis['is_baseline'] = True
             physique_analysis['message'] = "Great! This is your baseline scan. Future scans will show your progress."
         else:
-            # Calculate progression from baseline
-            baseline_scores = json.loads(baseline_scan['scores_json'])
-            
-            # Calculate days since baseline
-            baseline_date = datetime.fromisoformat(baseline_scan['scan_date'])
-            days_since = (datetime.now() - baseline_date).days
-            
-            # Save progression
-            db.save_progression(
-                user_id,
-                scan_id,
-                physique_analysis['scores'],
-                baseline_scores,
-                days_since
-            )
-            
             # Add progression info to response
             physique_analysis['is_baseline'] = False
             physique_analysis['days_since_baseline'] = days_since
@@ -133,17 +130,55 @@ async def analyze_physique(request: TwoPoseAnalyzeRequest):
         diet_plan = generate_diet_plan(legacy_analysis)
         workout = generate_workout_routine(legacy_analysis)
         
-        return {
+        # Returned as a response so FastAPI skips its jsonable_encoder pass over the payload
+        return ORJSONResponse({
             "physique": physique_analysis,
             "dietPlan": diet_plan,
             "workoutRoutine": workout
-        }
+        })
     except ValueError as e:
-        print(f"[ERROR] ValueError: {e}")
+        logger.warning("ValueError: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"[ERROR] Exception: {type(e).__name__}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Physique analysis failed")
         raise HTTPException(status_code=500, detail=f"Physique analysis failed: {str(e)}")
 
+
+@router.get("/progression/{user_id}")
+def get_progression(user_id: str, db: Database = Depends(get_db)):
+    """
+    Get a user's score changes since their baseline scan, oldest first
+    
+    The JSON array is built inside SQLite and returned without re-encoding.
+    """
+    return Response(content=db.get_progression_history_json(user_id), media_type='application/json')
+
+
+# Upper bound for one page of /scans; older pages are fetched with before_scan_id
+MAX_SCANS_PAGE = 100
+
+
+def _stream_json_array(scans: List[Dict]) -> Iterator[bytes]:
+    """Encode scans as one JSON array, one chunk per scan"""
+    yield b'['
+    for i, scan in enumerate(scans):
+        yield (b',' if i else b'') + orjson.dumps(scan, option=orjson.OPT_SERIALIZE_NUMPY)
+    yield b']'
+
+
+@router.get("/scans/{user_id}")
+def get_scans(
+    user_id: str,
+    limit: int = Query(10, ge=1, le=MAX_SCANS_PAGE),
+    before_scan_id: Optional[int] = None,
+    db: Database = Depends(get_db)
+):
+    """
+    Get a page of a user's scans, newest first
+    
+    Pass the last scan_id of a page as before_scan_id to get the next page. The page is
+    read before the response starts, then encoded and sent one scan at a time, so a slow
+    client never holds a database reader.
+    """
+    scans = db.get_user_scans(user_id, limit=limit, before_scan_id=before_scan_id)
+    return StreamingResponse(_stream_json_array(scans), media_type='application/json')
@@ -3,7 +3,59 @@ Body Analysis Module - Python implementation
 Analyzes body composition, generates diet plans and workout routines
 """
 import math
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, FrozenSet, Tuple
+
+import numpy as np
+
+from utils.jit import njit
+from utils.landmarks import Landmarks, landmarks_to_array
+
+
+# Key landmark indices (MediaPipe Pose)
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+LEFT_HIP = 23
+RIGHT_HIP = 24
+LEFT_WRIST = 15
+LEFT_ANKLE = 27
+NOSE = 0
+
+
+@njit(cache=True)
+def _landmark_distance(arr, a, b):
+    """2D distance between landmark rows a and b of a landmark array"""
+    dx = arr[a, 0] - arr[b, 0]
+    dy = arr[a, 1] - arr[b, 1]
+    return math.sqrt(dx * dx + dy * dy)
+
+
+@njit(cache=True)
+def _compute_metrics(arr):
+    """
+    Numeric core of analyze_body
+    
+    Returns:
+        (shoulder_width, hip_width, arm_length, leg_length, upper_body_height) in estimated cm,
+        followed by the left-right shoulder and hip height differences
+    """
+    shoulder_width = _landmark_distance(arr, LEFT_SHOULDER, RIGHT_SHOULDER) * 200
+    hip_width = _landmark_distance(arr, LEFT_HIP, RIGHT_HIP) * 200
+    arm_length = _landmark_distance(arr, LEFT_SHOULDER, LEFT_WRIST) * 200
+    leg_length = _landmark_distance(arr, LEFT_HIP, LEFT_ANKLE) * 200
+    upper_body_height = _landmark_distance(arr, NOSE, LEFT_HIP) * 200
+    shoulder_diff = abs(arr[LEFT_SHOULDER, 1] - arr[RIGHT_SHOULDER, 1])
+    hip_diff = abs(arr[LEFT_HIP, 1] - arr[RIGHT_HIP, 1])
+    return shoulder_width, hip_width, arm_length, leg_length, upper_body_height, shoulder_diff, hip_diff
+
+
+def warm_up_kernels():
+    """
+    Compile (or load from the on-disk cache) the numba kernels for the request array layout
+    
+    Call once at startup so the first request does not pay compilation time.
+    """
+    _compute_metrics(np.zeros((33, 4)))
 
 
 def calculate_distance(point1: Dict[str, float], point2: Dict[str, float]) -> float:
@@ -28,36 +80,22 @@ def estimate_bmi(waist_width: float, shoulder_width: float) -> float:
     return 18 + (ratio - 0.6) * 15
 
 
-def analyze_body(landmarks: List[Dict[str, float]]) -> Dict[str, Any]:
+def analyze_body(landmarks: Landmarks) -> Dict[str, Any]:
     """
     Analyze body composition from pose landmarks
     
     Args:
-        landmarks: List of pose landmarks with x, y, z, visibility
+        landmarks: Pose landmarks with x, y, z, visibility, as a list of dicts or (N, 4) array
     
     Returns:
         Complete body analysis with measurements and assessments
     """
-    if not landmarks or len(landmarks) < 33:
+    if landmarks is None or len(landmarks) < 33:
         raise ValueError('Insufficient pose landmarks detected')
     
-    # Key landmark indices (MediaPipe Pose)
-    LEFT_SHOULDER = 11
-    RIGHT_SHOULDER = 12
-    LEFT_HIP = 23
-    RIGHT_HIP = 24
-    LEFT_ELBOW = 13
-    LEFT_WRIST = 15
-    LEFT_KNEE = 25
-    LEFT_ANKLE = 27
-    LEFT_EAR = 7
-    NOSE = 0
-    
     # Calculate measurements (normalized coordinates, converted to estimated cm)
-    shoulder_width = calculate_distance(landmarks[LEFT_SHOULDER], landmarks[RIGHT_SHOULDER]) * 200
-    hip_width = calculate_distance(landmarks[LEFT_HIP], landmarks[RIGHT_HIP]) * 200
-    arm_length = calculate_distance(landmarks[LEFT_SHOULDER], landmarks[LEFT_WRIST]) * 200
-    leg_length = calculate_distance(landmarks[LEFT_HIP], landmarks[LEFT_ANKLE]) * 200
+    (shoulder_width, hip_width, arm_length, leg_length, upper_body_height,
+     left_right_shoulder_diff, left_right_hip_diff) = _compute_metrics(landmarks_to_array(landmarks))
     
     # Estimate chest and waist (using shoulder and hip as proxies)
     chest_width = shoulder_width * 0.85
@@ -66,7 +104,6 @@ def analyze_body(landmarks: List[Dict[str, float]]) -> Dict[str, Any]:
     # Analyze proportions and symmetry
     shoulder_hip_ratio = shoulder_width / hip_width if hip_width > 0 else 1
     arm_to_leg_ratio = arm_length / leg_length if leg_length > 0 else 1
-    upper_body_height = calculate_distance(landmarks[NOSE], landmarks[LEFT_HIP]) * 200
     lower_body_height = leg_length
     torso_leg_ratio = upper_body_height / lower_body_height if lower_body_height > 0 else 1
     
@@ -100,9 +137,6 @@ def analyze_body(landmarks: List[Dict[str, float]]) -> Dict[str, Any]:
         weak_spots.append('Longer arms relative to legs - focus on leg development')
     
     # Posture and symmetry checks
-    left_right_shoulder_diff = abs(landmarks[LEFT_SHOULDER]['y'] - landmarks[RIGHT_SHOULDER]['y'])
-    left_right_hip_diff = abs(landmarks[LEFT_HIP]['y'] - landmarks[RIGHT_HIP]['y'])
-    
     if left_right_shoulder_diff < 0.02:
         strong_spots.append('Excellent shoulder symmetry')
     else:
@@ -134,23 +168,76 @@ def analyze_body(landmarks: List[Dict[str, float]]) -> Dict[str, Any]:
     }
 
 
-def generate_diet_plan(analysis: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Generate personalized diet plan based on body analysis
-    
-    Args:
-        analysis: Body analysis results
-    
-    Returns:
-        Diet plan with calories, macros, and meal suggestions
-    """
+# Meal suggestions shared by every diet plan
+DIET_MEALS = (
+    'Breakfast: Oatmeal with berries, Greek yogurt, and almonds',
+    'Mid-morning: Protein shake with banana',
+    'Lunch: Grilled chicken breast, quinoa, and steamed vegetables',
+    'Afternoon snack: Apple with peanut butter',
+    'Dinner: Salmon, sweet potato, and mixed greens salad',
+    'Evening: Casein protein or cottage cheese',
+)
+
+# Weekly split shared by every workout routine: (day title, exercises)
+WORKOUT_DAYS = (
+    ('Day 1: Upper Body', (
+        'Barbell Bench Press: 4 sets x 6-8 reps',
+        'Overhead Press: 4 sets x 6-8 reps',
+        'Pull-ups: 4 sets x 8-10 reps',
+        'Barbell Rows: 4 sets x 8-10 reps',
+        'Lateral Raises: 3 sets x 12-15 reps',
+        'Tricep Dips: 3 sets x 10-12 reps',
+    )),
+    ('Day 2: Lower Body', (
+        'Barbell Squats: 4 sets x 6-8 reps',
+        'Romanian Deadlifts: 4 sets x 8-10 reps',
+        'Leg Press: 4 sets x 10-12 reps',
+        'Walking Lunges: 3 sets x 12 reps per leg',
+        'Leg Curls: 3 sets x 12-15 reps',
+        'Calf Raises: 4 sets x 15-20 reps',
+    )),
+    ('Day 3: Rest', (
+        'Active recovery: Light stretching or yoga',
+    )),
+    ('Day 4: Push Focus', (
+        'Incline Dumbbell Press: 4 sets x 8-10 reps',
+        'Dumbbell Shoulder Press: 4 sets x 8-10 reps',
+        'Cable Flyes: 3 sets x 12-15 reps',
+        'Side Lateral Raises: 3 sets x 15 reps',
+        'Overhead Tricep Extension: 3 sets x 12 reps',
+        'Push-ups: 3 sets to failure',
+    )),
+    ('Day 5: Pull Focus', (
+        'Deadlifts: 4 sets x 5-6 reps',
+        'Wide-Grip Pull-ups: 4 sets x 8-10 reps',
+        'T-Bar Rows: 4 sets x 8-10 reps',
+        'Face Pulls: 3 sets x 15 reps',
+        'Barbell Curls: 3 sets x 10-12 reps',
+        'Hammer Curls: 3 sets x 12 reps',
+    )),
+    ('Day 6: Legs & Core', (
+        'Front Squats: 4 sets x 8-10 reps',
+        'Bulgarian Split Squats: 3 sets x 10 reps per leg',
+        'Romanian Deadlifts: 3 sets x 10 reps',
+        'Plank: 3 sets x 60 seconds',
+        'Russian Twists: 3 sets x 20 reps',
+        'Leg Raises: 3 sets x 15 reps',
+    )),
+    ('Day 7: Rest', (
+        'Complete rest or light activity',
+    )),
+)
+
+
+@lru_cache(maxsize=64)
+def _diet_for(bucket: int) -> Tuple[int, int, int, int]:
+    """Calories and macros (calories, protein, carbs, fats) for a body-fat bucket (-1, 0, +1)"""
     base_calories = 2000
-    body_fat = analysis['bodyFatEstimate']
     
     # Adjust calories based on body fat percentage
-    if body_fat > 18:
+    if bucket > 0:
         adjustment = -300
-    elif body_fat < 12:
+    elif bucket < 0:
         adjustment = 300
     else:
         adjustment = 0
@@ -162,24 +249,60 @@ def generate_diet_plan(analysis: Dict[str, Any]) -> Dict[str, Any]:
     carbs = round(calories * 0.4 / 4)    # 40% calories from carbs (4 cal/g)
     fats = round(calories * 0.3 / 9)     # 30% calories from fats (9 cal/g)
     
-    meals = [
-        'Breakfast: Oatmeal with berries, Greek yogurt, and almonds',
-        'Mid-morning: Protein shake with banana',
-        'Lunch: Grilled chicken breast, quinoa, and steamed vegetables',
-        'Afternoon snack: Apple with peanut butter',
-        'Dinner: Salmon, sweet potato, and mixed greens salad',
-        'Evening: Casein protein or cottage cheese',
-    ]
+    return calories, protein, carbs, fats
+
+
+def generate_diet_plan(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generate personalized diet plan based on body analysis
+    
+    Args:
+        analysis: Body analysis results
+    
+    Returns:
+        Diet plan with calories, macros, and meal suggestions
+    """
+    body_fat = analysis['bodyFatEstimate']
+    bucket = 1 if body_fat > 18 else -1 if body_fat < 12 else 0
+    
+    calories, protein, carbs, fats = _diet_for(bucket)
     
     return {
         'calories': calories,
         'protein': protein,
         'carbs': carbs,
         'fats': fats,
-        'meals': meals,
+        'meals': list(DIET_MEALS),
     }
 
 
+def _weak_categories(weak_spots: List[str]) -> FrozenSet[str]:
+    """Reduce weak-spot descriptions to the training categories they mention"""
+    categories = set()
+    for spot in weak_spots:
+        spot = spot.lower()
+        if 'shoulder' in spot:
+            categories.add('shoulders')
+        if 'waist' in spot or 'core' in spot:
+            categories.add('core')
+        if 'leg' in spot:
+            categories.add('legs')
+    return frozenset(categories)
+
+
+@lru_cache(maxsize=64)
+def _workout_focus_for(weak: FrozenSet[str]) -> str:
+    """Training focus for a set of weak categories (later checks take priority)"""
+    focus = 'Balanced full-body development'
+    if 'shoulders' in weak:
+        focus = 'Upper body emphasis - shoulders and back'
+    if 'core' in weak:
+        focus = 'Core strengthening and definition'
+    if 'legs' in weak:
+        focus = 'Lower body power and size'
+    return focus
+
+
 def generate_workout_routine(analysis: Dict[str, Any]) -> Dict[str, Any]:
     """
     Generate personalized workout routine based on body analysis
@@ -190,89 +313,9 @@ def generate_workout_routine(analysis: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Workout routine with focus areas and daily exercises
     """
-    weak_spots = analysis['weakSpots']
-    
-    # Determine training focus
-    has_weak_shoulders = any('shoulder' in spot.lower() for spot in weak_spots)
-    has_weak_core = any('waist' in spot.lower() or 'core' in spot.lower() for spot in weak_spots)
-    has_weak_legs = any('leg' in spot.lower() for spot in weak_spots)
-    
-    focus = 'Balanced full-body development'
-    if has_weak_shoulders:
-        focus = 'Upper body emphasis - shoulders and back'
-    if has_weak_core:
-        focus = 'Core strengthening and definition'
-    if has_weak_legs:
-        focus = 'Lower body power and size'
-    
-    days = [
-        {
-            'day': 'Day 1: Upper Body',
-            'exercises': [
-                'Barbell Bench Press: 4 sets x 6-8 reps',
-                'Overhead Press: 4 sets x 6-8 reps',
-                'Pull-ups: 4 sets x 8-10 reps',
-                'Barbell Rows: 4 sets x 8-10 reps',
-                'Lateral Raises: 3 sets x 12-15 reps',
-                'Tricep Dips: 3 sets x 10-12 reps',
-            ],
-        },
-        {
-            'day': 'Day 2: Lower Body',
-            'exercises': [
-                'Barbell Squats: 4 sets x 6-8 reps',
-                'Romanian Deadlifts: 4 sets x 8-10 reps',
-                'Leg Press: 4 sets x 10-12 reps',
-                'Walking Lunges: 3 sets x 12 reps per leg',
-                'Leg Curls: 3 sets x 12-15 reps',
-                'Calf Raises: 4 sets x 15-20 reps',
-            ],
-        },
-        {
-            'day': 'Day 3: Rest',
-            'exercises': ['Active recovery: Light stretching or yoga'],
-        },
-        {
-            'day': 'Day 4: Push Focus',
-            'exercises': [
-                'Incline Dumbbell Press: 4 sets x 8-10 reps',
-                'Dumbbell Shoulder Press: 4 sets x 8-10 reps',
-                'Cable Flyes: 3 sets x 12-15 reps',
-                'Side Lateral Raises: 3 sets x 15 reps',
-                'Overhead Tricep Extension: 3 sets x 12 reps',
-                'Push-ups: 3 sets to failure',
-            ],
-        },
-        {
-            'day': 'Day 5: Pull Focus',
-            'exercises': [
-                'Deadlifts: 4 sets x 5-6 reps',
-                'Wide-Grip Pull-ups: 4 sets x 8-10 reps',
-                'T-Bar Rows: 4 sets x 8-10 reps',
-                'Face Pulls: 3 sets x 15 reps',
-                'Barbell Curls: 3 sets x 10-12 reps',
-                'Hammer Curls: 3 sets x 12 reps',
-            ],
-        },
-        {
-            'day': 'Day 6: Legs & Core',
-            'exercises': [
-                'Front Squats: 4 sets x 8-10 reps',
-                'Bulgarian Split Squats: 3 sets x 10 reps per leg',
-                'Romanian Deadlifts: 3 sets x 10 reps',
-                'Plank: 3 sets x 60 seconds',
-                'Russian Twists: 3 sets x 20 reps',
-                'Leg Raises: 3 sets x 15 reps',
-            ],
-        },
-        {
-            'day': 'Day 7: Rest',
-            'exercises': ['Complete rest or light activity'],
-        },
-    ]
+    focus = _workout_focus_for(_weak_categories(analysis['weakSpots']))
     
     return {
         'focus': focus,
-        'days': days,
+        'days': [{'day': day, 'exercises': list(exercises)} for day, exercises in WORKOUT_DAYS],
     }
-
@@ -2,8 +2,34 @@
 Body Scanner Module - Python implementation
 Processes pose landmarks from MediaPipe
 """
-from typing import List, Dict, Any
-import math
+import threading
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+
+from utils.landmarks import Landmarks
+
+
+# Key body landmarks (MediaPipe Pose) as (name, index) pairs
+KEY_LANDMARK_INDICES = (
+    ('nose', 0),
+    ('left_eye', 2),
+    ('right_eye', 5),
+    ('left_ear', 7),
+    ('right_ear', 8),
+    ('left_shoulder', 11),
+    ('right_shoulder', 12),
+    ('left_elbow', 13),
+    ('right_elbow', 14),
+    ('left_wrist', 15),
+    ('right_wrist', 16),
+    ('left_hip', 23),
+    ('right_hip', 24),
+    ('left_knee', 25),
+    ('right_knee', 26),
+    ('left_ankle', 27),
+    ('right_ankle', 28),
+)
 
 
 def process_pose_landmarks(landmarks: List[Dict[str, float]]) -> Dict[str, Any]:
@@ -38,15 +64,41 @@ def process_pose_landmarks(landmarks: List[Dict[str, float]]) -> Dict[str, Any]:
     }
 
 
-def validate_pose_stability(current_pose: List[Dict[str, float]], 
-                            previous_pose: List[Dict[str, float]],
-                            threshold: float = 0.1) -> Dict[str, Any]:
+# Per-thread scratch buffers for frame-to-frame stability checks, reused across calls
+_stability_scratch = threading.local()
+
+
+def _stability_buffers(count: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Return this thread's (cur_xy, prev_xy, diff, dist) buffers sized for count landmarks"""
+    buffers = getattr(_stability_scratch, 'buffers', None)
+    if buffers is None or buffers[3].shape[0] != count:
+        buffers = (
+            np.empty((count, 2)),
+            np.empty((count, 2)),
+            np.empty((count, 2)),
+            np.empty(count),
+        )
+        _stability_scratch.buffers = buffers
+    return buffers
+
+
+def _fill_xy(buffer: np.ndarray, landmarks: List[Dict[str, float]]):
+    for i, lm in enumerate(landmarks):
+        buffer[i] = (lm['x'], lm['y'])
+
+
+def validate_pose_stability_np(current_pose: np.ndarray,
+                               previous_pose: np.ndarray,
+                               threshold: float = 0.1) -> Dict[str, Any]:
     """
-    Check if pose is stable between frames
+    Check if pose is stable between frames, for landmark arrays
+    
+    Only the x and y columns are read. Intermediate results go into this thread's
+    scratch buffers, so per-frame calls do not allocate new arrays.
     
     Args:
-        current_pose: Current frame landmarks
-        previous_pose: Previous frame landmarks
+        current_pose: Current frame landmarks, (N, 2+) array
+        previous_pose: Previous frame landmarks, (N, 2+) array
         threshold: Movement threshold for stability
     
     Returns:
@@ -59,14 +111,13 @@ def validate_pose_stability(current_pose: List[Dict[str, float]],
             'reason': 'Landmark count mismatch'
         }
     
-    # Calculate average movement
-    total_movement = 0
-    for i in range(min(len(current_pose), len(previous_pose))):
-        dx = current_pose[i]['x'] - previous_pose[i]['x']
-        dy = current_pose[i]['y'] - previous_pose[i]['y']
-        total_movement += math.sqrt(dx * dx + dy * dy)
-    
-    avg_movement = total_movement / len(current_pose)
+    # Per-landmark euclidean movement, same arithmetic as np.linalg.norm(axis=1)
+    _, _, diff, dist = _stability_buffers(len(current_pose))
+    np.subtract(current_pose[:, :2], previous_pose[:, :2], out=diff)
+    np.multiply(diff, diff, out=diff)
+    np.add.reduce(diff, axis=1, out=dist)
+    np.sqrt(dist, out=dist)
+    avg_movement = float(dist.mean())
     is_stable = avg_movement < threshold
     
     return {
@@ -77,40 +128,48 @@ def validate_pose_stability(current_pose: List[Dict[str, float]],
     }
 
 
-def extract_key_landmarks(landmarks: List[Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+def validate_pose_stability(current_pose: Landmarks, 
+                            previous_pose: Landmarks,
+                            threshold: float = 0.1) -> Dict[str, Any]:
     """
-    Extract key body landmarks for easier access
+    Check if pose is stable between frames
     
     Args:
-        landmarks: Full list of pose landmarks
+        current_pose: Current frame landmarks, (N, 4) array or list of dicts
+        previous_pose: Previous frame landmarks, (N, 4) array or list of dicts
+        threshold: Movement threshold for stability
     
     Returns:
-        Dictionary of key landmarks
+        Stability metrics
     """
-    key_indices = {
-        'nose': 0,
-        'left_eye': 2,
-        'right_eye': 5,
-        'left_ear': 7,
-        'right_ear': 8,
-        'left_shoulder': 11,
-        'right_shoulder': 12,
-        'left_elbow': 13,
-        'right_elbow': 14,
-        'left_wrist': 15,
-        'right_wrist': 16,
-        'left_hip': 23,
-        'right_hip': 24,
-        'left_knee': 25,
-        'right_knee': 26,
-        'left_ankle': 27,
-        'right_ankle': 28,
-    }
+    if len(current_pose) != len(previous_pose):
+        return {
+            'is_stable': False,
+            'movement': float('inf'),
+            'reason': 'Landmark count mismatch'
+        }
     
-    key_landmarks = {}
-    for name, idx in key_indices.items():
-        if idx < len(landmarks):
-            key_landmarks[name] = landmarks[idx]
+    # Dict lists are copied into the reusable x/y buffers instead of new arrays
+    cur_xy, prev_xy, _, _ = _stability_buffers(len(current_pose))
+    if not isinstance(current_pose, np.ndarray):
+        _fill_xy(cur_xy, current_pose)
+        current_pose = cur_xy
+    if not isinstance(previous_pose, np.ndarray):
+        _fill_xy(prev_xy, previous_pose)
+        previous_pose = prev_xy
     
-    return key_landmarks
+    return validate_pose_stability_np(current_pose, previous_pose, threshold)
 
+
+def extract_key_landmarks(landmarks: Landmarks) -> Dict[str, Any]:
+    """
+    Extract key body landmarks for easier access
+    
+    Args:
+        landmarks: Full list (or array) of pose landmarks
+    
+    Returns:
+        Dictionary of key landmarks
+    """
+    count = len(landmarks)
+    return {name: landmarks[idx] for name, idx in KEY_LANDMARK_INDICES if idx < count}
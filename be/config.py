@@ -2,7 +2,7 @@
 Configuration Module
 """
 import os
-from typing import List
+from typing import List, Optional
 
 
 class Settings:
@@ -13,6 +13,8 @@ class Settings:
     PORT: int = int(os.getenv("PORT", "8000"))
     RELOAD: bool = os.getenv("RELOAD", "true").lower() == "true"
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "info")
+    # Worker threads for sync (def) handlers
+    THREADPOOL_SIZE: int = int(os.getenv("THREADPOOL_SIZE", "32"))
     
     # CORS settings
     ALLOWED_ORIGINS: List[str] = os.getenv(
@@ -20,6 +22,10 @@ class Settings:
         "http://localhost:3000,http://localhost:3001"
     ).split(",")
     
+    # Storage settings
+    # Shared pathway/progress store for multi-worker deployments; in-process memory if unset
+    REDIS_URL: Optional[str] = os.getenv("REDIS_URL") or None
+    
     # API settings
     API_PREFIX: str = "/api"
     API_VERSION: str = "1.0.0"
@@ -3,35 +3,307 @@ Database Models and Schema
 SQLite database for storing user scans, baseline data, and progression tracking
 """
 from datetime import datetime
-from typing import Optional, List, Dict
-import json
+from typing import Optional, List, Dict, Iterable, Iterator, Tuple
+from contextlib import contextmanager
+import atexit
+import queue
 import sqlite3
 import os
+import threading
+
+import numpy as np
+import orjson
+from cachetools import LRUCache
+
+from utils.landmarks import Landmarks, landmarks_to_array, landmarks_to_blob, landmarks_from_blob
+
+
+IN_MEMORY_PATH = ':memory:'
+
+# Read-only connections shared by get_* calls; writes go through one locked connection
+READER_POOL_SIZE = 8
+# How long a read waits for a free pooled reader before failing
+READER_TIMEOUT_SECONDS = 10.0
+
+# Users whose baseline scan row is kept in memory
+BASELINE_CACHE_SIZE = 1024
+
+# Bumped whenever init_database gains a table, index or migration; stored in PRAGMA user_version
+SCHEMA_VERSION = 2
+
+# Prepared statements kept per connection; sqlite3 reuses them when the SQL text matches
+STATEMENT_CACHE_SIZE = 256
+
+# Per-connection settings: fewer fsyncs under WAL, bigger page cache, memory-mapped reads.
+# Busy waiting is configured by the connect timeout.
+CONNECTION_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-65536',        # 64 MB page cache
+    'PRAGMA wal_autocheckpoint=1000',  # checkpoint every 1000 WAL pages
+)
+FILE_PRAGMAS = (
+    'PRAGMA mmap_size=268435456',      # 256 MB memory-mapped I/O
+)
+
+# Landmark indices (MediaPipe Pose) for the baseline shoulder, hip, arm and leg segments
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+LEFT_HIP = 23
+RIGHT_HIP = 24
+LEFT_WRIST = 15
+LEFT_ANKLE = 27
+BASELINE_SEGMENT_STARTS = np.array([LEFT_SHOULDER, LEFT_HIP, LEFT_SHOULDER, LEFT_HIP])
+BASELINE_SEGMENT_ENDS = np.array([RIGHT_SHOULDER, RIGHT_HIP, LEFT_WRIST, LEFT_ANKLE])
+
+
+def _dumps(obj) -> str:
+    """Serialize a value for a JSON TEXT column"""
+    return orjson.dumps(obj).decode()
+
+
+def _scan_dict(row: sqlite3.Row) -> Dict:
+    """Convert a scans row to a dict with landmark BLOBs unpacked to arrays"""
+    scan = dict(row)
+    scan['front_pose_data'] = landmarks_from_blob(scan['front_pose_data'])
+    scan['side_pose_data'] = landmarks_from_blob(scan['side_pose_data'])
+    return scan
+
+
+# Tables looked up by user_id are stored WITHOUT ROWID so the primary key is the table's only B-tree
+USERS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        user_id TEXT PRIMARY KEY,
+        gender TEXT NOT NULL,
+        height_cm REAL,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    ) WITHOUT ROWID
+"""
+USERS_COLUMNS = ('user_id', 'gender', 'height_cm', 'created_at', 'updated_at')
+
+BASELINE_METRICS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        user_id TEXT NOT NULL PRIMARY KEY,
+        baseline_scan_id INTEGER NOT NULL,
+        shoulder_hip_ratio REAL NOT NULL,
+        waist_shoulder_ratio REAL NOT NULL,
+        arm_leg_ratio REAL NOT NULL,
+        shoulder_width_normalized REAL NOT NULL,
+        hip_width_normalized REAL NOT NULL,
+        created_at TEXT NOT NULL,
+        FOREIGN KEY (user_id) REFERENCES users(user_id),
+        FOREIGN KEY (baseline_scan_id) REFERENCES scans(scan_id)
+    ) WITHOUT ROWID
+"""
+BASELINE_METRICS_COLUMNS = (
+    'user_id', 'baseline_scan_id',
+    'shoulder_hip_ratio', 'waist_shoulder_ratio', 'arm_leg_ratio',
+    'shoulder_width_normalized', 'hip_width_normalized',
+    'created_at',
+)
+
+# scores dict keys and the scans columns they are stored in (overall goes to overall_score)
+SCORE_COLUMNS = (
+    ('shoulders', 'shoulders_score'),
+    ('chest', 'chest_score'),
+    ('core', 'core_score'),
+    ('v_taper', 'v_taper_score'),
+    ('symmetry', 'symmetry_score'),
+    ('posture', 'posture_score'),
+    ('arms', 'arms_score'),
+)
+
+# Write statements shared by the single-purpose and bundled save paths
+USER_INSERT = """
+    INSERT INTO users (user_id, gender, height_cm, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+SCAN_INSERT = """
+    INSERT INTO scans (
+        user_id, scan_date, is_baseline,
+        front_pose_data, side_pose_data,
+        overall_score, scores_json,
+        body_type, frame,
+        strong_areas_json, growth_areas_json,
+        key_insight,
+        shoulders_score, chest_score, core_score, v_taper_score,
+        symmetry_score, posture_score, arms_score
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+BASELINE_METRICS_INSERT = """
+    INSERT OR REPLACE INTO baseline_metrics (
+        user_id, baseline_scan_id,
+        shoulder_hip_ratio, waist_shoulder_ratio, arm_leg_ratio,
+        shoulder_width_normalized, hip_width_normalized,
+        created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+PROGRESSION_INSERT = """
+    INSERT INTO progression (
+        user_id, scan_id, days_since_baseline,
+        overall_score_delta,
+        shoulder_score_delta, chest_score_delta, core_score_delta,
+        v_taper_score_delta, symmetry_score_delta,
+        posture_score_delta, arms_score_delta,
+        created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Progression row for a new scan, with deltas taken against the user's stored baseline scan
+PROGRESSION_FROM_BASELINE_INSERT = """
+    INSERT INTO progression (
+        user_id, scan_id, days_since_baseline,
+        overall_score_delta,
+        shoulder_score_delta, chest_score_delta, core_score_delta,
+        v_taper_score_delta, symmetry_score_delta,
+        posture_score_delta, arms_score_delta,
+        created_at
+    )
+    SELECT
+        ?, ?, ?,
+        ? - s.overall_score,
+        ? - COALESCE(s.shoulders_score, 0),
+        ? - COALESCE(s.chest_score, 0),
+        ? - COALESCE(s.core_score, 0),
+        ? - COALESCE(s.v_taper_score, 0),
+        ? - COALESCE(s.symmetry_score, 0),
+        ? - COALESCE(s.posture_score, 0),
+        ? - COALESCE(s.arms_score, 0),
+        ?
+    FROM scans s
+    WHERE s.user_id = ? AND s.is_baseline = 1
+    LIMIT 1
+"""
 
 
 class Database:
-    """Simple SQLite database wrapper"""
+    """
+    Simple SQLite database wrapper
+    
+    Connections stay open for the life of the process: one autocommit writer
+    serialized by a lock, plus a pool of read-only readers that run alongside it under WAL.
+    """
     
     def __init__(self, db_path: str = "bodyapp.db"):
         self.db_path = db_path
-        self.init_database()
+        self._writer = self._connect()
+        self._writer_lock = threading.Lock()
+        # Baseline scans never change once written, so only found rows are cached;
+        # a user without one is re-checked because another worker may create it
+        self._baseline_cache: Dict[str, Dict] = LRUCache(maxsize=BASELINE_CACHE_SIZE)
+        self._baseline_cache_lock = threading.Lock()
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._closed = False
+        try:
+            self.init_database()
+            
+            # Readers open read-only, so they are created once the schema exists
+            if self.db_path != IN_MEMORY_PATH:
+                for _ in range(READER_POOL_SIZE):
+                    self._readers.put(self._connect(read_only=True))
+        except Exception:
+            self.close_all()
+            raise
+        atexit.register(self.close_all)
+    
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a connection with the shared per-connection settings"""
+        if read_only:
+            conn = sqlite3.connect(
+                f"file:{self.db_path}?mode=ro",
+                uri=True,
+                timeout=10.0,
+                check_same_thread=False,
+                isolation_level=None,
+                cached_statements=STATEMENT_CACHE_SIZE
+            )
+        else:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=10.0,
+                check_same_thread=False,
+                isolation_level=None,
+                cached_statements=STATEMENT_CACHE_SIZE
+            )
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        if self.db_path != IN_MEMORY_PATH:
+            for pragma in FILE_PRAGMAS:
+                conn.execute(pragma)
+        if read_only:
+            conn.execute('PRAGMA query_only=1')
+        return conn
+    
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Hold the single writer connection; writes from this process never queue inside SQLite"""
+        with self._writer_lock:
+            yield self._writer
+    
+    @contextmanager
+    def _read(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection, which under WAL never waits on the writer"""
+        if self.db_path == IN_MEMORY_PATH:
+            # Every in-memory connection is a separate database, so reads share the writer
+            with self._write() as conn:
+                yield conn
+            return
+        
+        try:
+            conn = self._readers.get(timeout=READER_TIMEOUT_SECONDS)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"No database reader free after {READER_TIMEOUT_SECONDS:g}s; all {READER_POOL_SIZE} are in use"
+            )
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+    
+    def warm_up(self):
+        """Touch the writer and every reader so the schema is loaded ahead of the first request"""
+        with self._write() as conn:
+            conn.execute("SELECT 1 FROM users LIMIT 1").fetchall()
+        readers = []
+        while not self._readers.empty():
+            readers.append(self._readers.get())
+        for conn in readers:
+            conn.execute("SELECT 1 FROM users LIMIT 1").fetchall()
+            self._readers.put(conn)
+    
+    def close_all(self):
+        """Close the writer and all pooled readers; later calls do nothing"""
+        with self._writer_lock:
+            if self._closed:
+                return
+            self._closed = True
+            while not self._readers.empty():
+                self._readers.get().close()
+            self._writer.close()
+        atexit.unregister(self.close_all)
     
     def init_database(self):
-        """Initialize database tables"""
-        conn = sqlite3.connect(self.db_path, timeout=10.0)
-        conn.execute('PRAGMA journal_mode=WAL')  # Write-Ahead Logging for better concurrency
+        """Initialize database tables, skipping the DDL when the file is already at SCHEMA_VERSION"""
+        conn = self._writer
+        # Journal mode is stored in the database file, so it is set once here
+        if self.db_path != IN_MEMORY_PATH:
+            conn.execute('PRAGMA journal_mode=WAL')  # Write-Ahead Logging for better concurrency
         cursor = conn.cursor()
         
+        if cursor.execute('PRAGMA user_version').fetchone()[0] >= SCHEMA_VERSION:
+            return
+        
+        # Tables created before they were keyed WITHOUT ROWID are rebuilt first
+        self._migrate_without_rowid(cursor, 'users', USERS_TABLE_SQL, USERS_COLUMNS)
+        self._migrate_without_rowid(cursor, 'baseline_metrics', BASELINE_METRICS_TABLE_SQL, BASELINE_METRICS_COLUMNS)
+        
         # Users table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                user_id TEXT PRIMARY KEY,
-                gender TEXT NOT NULL,
-                height_cm REAL,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
-            )
-        """)
+        cursor.execute(USERS_TABLE_SQL.format(table='users'))
         
         # Scans table - stores all body scans
         cursor.execute("""
@@ -40,8 +312,8 @@ class Database:
                 user_id TEXT NOT NULL,
                 scan_date TEXT NOT NULL,
                 is_baseline INTEGER DEFAULT 0,
-                front_pose_data TEXT NOT NULL,
-                side_pose_data TEXT NOT NULL,
+                front_pose_data BLOB NOT NULL,
+                side_pose_data BLOB NOT NULL,
                 overall_score INTEGER NOT NULL,
                 scores_json TEXT NOT NULL,
                 body_type TEXT,
@@ -49,26 +321,20 @@ class Database:
                 strong_areas_json TEXT,
                 growth_areas_json TEXT,
                 key_insight TEXT,
+                shoulders_score INTEGER,
+                chest_score INTEGER,
+                core_score INTEGER,
+                v_taper_score INTEGER,
+                symmetry_score INTEGER,
+                posture_score INTEGER,
+                arms_score INTEGER,
                 FOREIGN KEY (user_id) REFERENCES users(user_id)
             )
         """)
+        self._migrate_score_columns(cursor)
         
         # Baseline metrics table - stores body proportions from first scan
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS baseline_metrics (
-                baseline_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL UNIQUE,
-                baseline_scan_id INTEGER NOT NULL,
-                shoulder_hip_ratio REAL NOT NULL,
-                waist_shoulder_ratio REAL NOT NULL,
-                arm_leg_ratio REAL NOT NULL,
-                shoulder_width_normalized REAL NOT NULL,
-                hip_width_normalized REAL NOT NULL,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY (user_id) REFERENCES users(user_id),
-                FOREIGN KEY (baseline_scan_id) REFERENCES scans(scan_id)
-            )
-        """)
+        cursor.execute(BASELINE_METRICS_TABLE_SQL.format(table='baseline_metrics'))
         
         # Progression tracking table - stores deltas and trends
         cursor.execute("""
@@ -103,129 +369,159 @@ class Database:
             ON progression(user_id, days_since_baseline)
         """)
         
-        conn.commit()
-        conn.close()
+        # Covers the progression history join so scans rows (with their landmark BLOBs) are not read
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_scans_cover_progression
+            ON scans(scan_id, scan_date, overall_score)
+        """)
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_progression_scan
+            ON progression(scan_id)
+        """)
+        
+        # Score trends per user are answered from this index alone
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_scans_user_scores
+            ON scans(
+                user_id, scan_date DESC, overall_score,
+                shoulders_score, chest_score, core_score, v_taper_score,
+                symmetry_score, posture_score, arms_score
+            )
+        """)
+        
+        # Keyset pages of a user's scans walk this index newest first without a sort
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_scans_user_cursor
+            ON scans(user_id, scan_id)
+        """)
+        
+        self._migrate_pose_blobs(cursor)
+        cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    
+    def _migrate_without_rowid(self, cursor: sqlite3.Cursor, table: str, create_sql: str, columns: Tuple[str, ...]):
+        """Rebuild an existing rowid table with its WITHOUT ROWID definition, keeping its rows"""
+        row = cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()
+        if row is None or 'WITHOUT ROWID' in row[0].upper():
+            return
+        
+        # Copy into a new table and rename it last, so foreign keys naming this table stay valid
+        column_list = ', '.join(columns)
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            cursor.execute(create_sql.format(table=f'{table}_new'))
+            cursor.execute(f"INSERT INTO {table}_new ({column_list}) SELECT {column_list} FROM {table}")
+            cursor.execute(f"DROP TABLE {table}")
+            cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+    
+    def _migrate_score_columns(self, cursor: sqlite3.Cursor):
+        """Add per-category score columns to an older scans table and fill them from scores_json"""
+        existing = {row[1] for row in cursor.execute("PRAGMA table_info(scans)").fetchall()}
+        missing = [(key, column) for key, column in SCORE_COLUMNS if column not in existing]
+        if not missing:
+            return
+        
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            for key, column in missing:
+                cursor.execute(f"ALTER TABLE scans ADD COLUMN {column} INTEGER")
+                cursor.execute(f"UPDATE scans SET {column} = json_extract(scores_json, '$.{key}')")
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+    
+    def _migrate_pose_blobs(self, cursor: sqlite3.Cursor):
+        """Rewrite scans saved with JSON landmark text as packed float32 BLOBs"""
+        rows = cursor.execute("""
+            SELECT scan_id, front_pose_data, side_pose_data FROM scans
+            WHERE typeof(front_pose_data) = 'text' OR typeof(side_pose_data) = 'text'
+        """).fetchall()
+        if not rows:
+            return
+        
+        def to_blob(value):
+            return landmarks_to_blob(orjson.loads(value)) if isinstance(value, str) else value
+        
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            cursor.executemany(
+                "UPDATE scans SET front_pose_data = ?, side_pose_data = ? WHERE scan_id = ?",
+                [(to_blob(front), to_blob(side), scan_id) for scan_id, front, side in rows]
+            )
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
     
     def create_user(self, user_id: str, gender: str, height_cm: Optional[float] = None) -> bool:
         """Create a new user"""
         try:
-            conn = sqlite3.connect(self.db_path, timeout=10.0)
-            cursor = conn.cursor()
             now = datetime.now().isoformat()
             
-            cursor.execute("""
-                INSERT INTO users (user_id, gender, height_cm, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?)
-            """, (user_id, gender, height_cm, now, now))
+            with self._write() as conn:
+                conn.execute(USER_INSERT, (user_id, gender, height_cm, now, now))
             
-            conn.commit()
-            conn.close()
             return True
         except sqlite3.IntegrityError:
             return False  # User already exists
     
-    def save_scan(
+    def _insert_scan(
         self,
+        cursor: sqlite3.Cursor,
         user_id: str,
-        front_pose: List[Dict],
-        side_pose: List[Dict],
+        front_pose: Landmarks,
+        side_pose: Landmarks,
         physique_analysis: Dict,
-        is_baseline: bool = False
-    ) -> Optional[int]:
-        """Save a body scan"""
-        conn = sqlite3.connect(self.db_path, timeout=10.0)
-        try:
-            cursor = conn.cursor()
-            now = datetime.now().isoformat()
-            
-            cursor.execute("""
-                INSERT INTO scans (
-                    user_id, scan_date, is_baseline,
-                    front_pose_data, side_pose_data,
-                    overall_score, scores_json,
-                    body_type, frame,
-                    strong_areas_json, growth_areas_json,
-                    key_insight
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                user_id,
-                now,
-                1 if is_baseline else 0,
-                json.dumps(front_pose),
-                json.dumps(side_pose),
-                physique_analysis['overall_score'],
-                json.dumps(physique_analysis['scores']),
-                physique_analysis.get('body_type'),
-                physique_analysis.get('frame'),
-                json.dumps(physique_analysis.get('strong_areas', [])),
-                json.dumps(physique_analysis.get('growth_areas', [])),
-                physique_analysis.get('key_insight')
-            ))
-            
-            scan_id = cursor.lastrowid
-            conn.commit()
-            
-            return scan_id
-        finally:
-            conn.close()
+        is_baseline: bool,
+        now: str
+    ) -> int:
+        scores = physique_analysis['scores']
+        if is_baseline:
+            with self._baseline_cache_lock:
+                self._baseline_cache.pop(user_id, None)
+        cursor.execute(SCAN_INSERT, (
+            user_id,
+            now,
+            1 if is_baseline else 0,
+            landmarks_to_blob(front_pose),
+            landmarks_to_blob(side_pose),
+            physique_analysis['overall_score'],
+            _dumps(scores),
+            physique_analysis.get('body_type'),
+            physique_analysis.get('frame'),
+            _dumps(physique_analysis.get('strong_areas', [])),
+            _dumps(physique_analysis.get('growth_areas', [])),
+            physique_analysis.get('key_insight'),
+            *(scores.get(key) for key, _ in SCORE_COLUMNS)
+        ))
+        
+        return cursor.lastrowid
     
-    def save_baseline_metrics(
+    def _insert_baseline_metrics(
         self,
+        cursor: sqlite3.Cursor,
         user_id: str,
         baseline_scan_id: int,
-        front_landmarks: List[Dict]
+        front_landmarks: Landmarks,
+        now: str
     ):
-        """Save baseline body proportions from first scan"""
-        import math
-        
-        def calc_distance(p1, p2):
-            dx = p1['x'] - p2['x']
-            dy = p1['y'] - p2['y']
-            return math.sqrt(dx * dx + dy * dy)
-        
-        # Calculate baseline ratios
-        LEFT_SHOULDER = 11
-        RIGHT_SHOULDER = 12
-        LEFT_HIP = 23
-        RIGHT_HIP = 24
-        LEFT_ELBOW = 13
-        LEFT_WRIST = 15
-        LEFT_KNEE = 25
-        LEFT_ANKLE = 27
-        
-        shoulder_width = calc_distance(
-            front_landmarks[LEFT_SHOULDER],
-            front_landmarks[RIGHT_SHOULDER]
-        )
-        hip_width = calc_distance(
-            front_landmarks[LEFT_HIP],
-            front_landmarks[RIGHT_HIP]
-        )
-        arm_length = calc_distance(
-            front_landmarks[LEFT_SHOULDER],
-            front_landmarks[LEFT_WRIST]
-        )
-        leg_length = calc_distance(
-            front_landmarks[LEFT_HIP],
-            front_landmarks[LEFT_ANKLE]
-        )
+        # Shoulder, hip, arm and leg lengths in one vectorized pass
+        xy = landmarks_to_array(front_landmarks)[:, :2]
+        deltas = xy[BASELINE_SEGMENT_STARTS] - xy[BASELINE_SEGMENT_ENDS]
+        shoulder_width, hip_width, arm_length, leg_length = np.sqrt((deltas * deltas).sum(axis=1)).tolist()
         
         shoulder_hip_ratio = shoulder_width / hip_width if hip_width > 0 else 1.0
         waist_shoulder_ratio = (hip_width * 0.75) / shoulder_width if shoulder_width > 0 else 1.0
         arm_leg_ratio = arm_length / leg_length if leg_length > 0 else 1.0
         
-        conn = sqlite3.connect(self.db_path, timeout=10.0)
-        cursor = conn.cursor()
-        now = datetime.now().isoformat()
-        
-        cursor.execute("""
-            INSERT OR REPLACE INTO baseline_metrics (
-                user_id, baseline_scan_id,
-                shoulder_hip_ratio, waist_shoulder_ratio, arm_leg_ratio,
-                shoulder_width_normalized, hip_width_normalized,
-                created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        cursor.execute(BASELINE_METRICS_INSERT, (
             user_id,
             baseline_scan_id,
             shoulder_hip_ratio,
@@ -235,36 +531,20 @@ class Database:
             hip_width,
             now
         ))
-        
-        conn.commit()
-        conn.close()
     
-    def save_progression(
-        self,
+    @staticmethod
+    def _progression_row(
         user_id: str,
         scan_id: int,
         current_scores: Dict[str, int],
         baseline_scores: Dict[str, int],
-        days_since_baseline: int
-    ):
-        """Save progression data comparing current scan to baseline"""
-        conn = sqlite3.connect(self.db_path, timeout=10.0)
-        cursor = conn.cursor()
-        now = datetime.now().isoformat()
-        
+        days_since_baseline: int,
+        now: str
+    ) -> Tuple:
         # Calculate deltas
         overall_delta = current_scores['overall'] - baseline_scores.get('overall', 0)
         
-        cursor.execute("""
-            INSERT INTO progression (
-                user_id, scan_id, days_since_baseline,
-                overall_score_delta,
-                shoulder_score_delta, chest_score_delta, core_score_delta,
-                v_taper_score_delta, symmetry_score_delta,
-                posture_score_delta, arms_score_delta,
-                created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        return (
             user_id,
             scan_id,
             days_since_baseline,
@@ -277,68 +557,210 @@ class Database:
             current_scores.get('posture', 0) - baseline_scores.get('posture', 0),
             current_scores.get('arms', 0) - baseline_scores.get('arms', 0),
             now
-        ))
+        )
+    
+    def save_scan(
+        self,
+        user_id: str,
+        front_pose: Landmarks,
+        side_pose: Landmarks,
+        physique_analysis: Dict,
+        is_baseline: bool = False
+    ) -> Optional[int]:
+        """Save a body scan"""
+        with self._write() as conn:
+            return self._insert_scan(
+                conn.cursor(),
+                user_id, front_pose, side_pose, physique_analysis, is_baseline,
+                datetime.now().isoformat()
+            )
+    
+    def save_baseline_metrics(
+        self,
+        user_id: str,
+        baseline_scan_id: int,
+        front_landmarks: Landmarks
+    ):
+        """Save baseline body proportions from first scan"""
+        with self._write() as conn:
+            self._insert_baseline_metrics(
+                conn.cursor(), user_id, baseline_scan_id, front_landmarks, datetime.now().isoformat()
+            )
+    
+    def save_progression(
+        self,
+        user_id: str,
+        scan_id: int,
+        current_scores: Dict[str, int],
+        baseline_scores: Dict[str, int],
+        days_since_baseline: int
+    ):
+        """Save progression data comparing current scan to baseline"""
+        self.save_progressions([(user_id, scan_id, current_scores, baseline_scores, days_since_baseline)])
+    
+    def save_progressions(self, entries: Iterable[Tuple[str, int, Dict[str, int], Dict[str, int], int]]):
+        """
+        Save several progression entries in one transaction
+        
+        Args:
+            entries: (user_id, scan_id, current_scores, baseline_scores, days_since_baseline) tuples
+        """
+        now = datetime.now().isoformat()
+        rows = [self._progression_row(*entry, now) for entry in entries]
+        with self._write() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                cursor.executemany(PROGRESSION_INSERT, rows)
+                cursor.execute('COMMIT')
+            except Exception:
+                cursor.execute('ROLLBACK')
+                raise
+    
+    def save_scan_bundle(
+        self,
+        user_id: str,
+        front_pose: Landmarks,
+        side_pose: Landmarks,
+        physique_analysis: Dict,
+        days_since_baseline: Optional[int],
+        is_baseline: bool
+    ) -> int:
+        """
+        Save a scan plus its baseline metrics or progression entry in one transaction
+        
+        Baseline scans also store baseline metrics; later scans store progression
+        deltas computed by SQLite against the user's stored baseline scan.
         
-        conn.commit()
-        conn.close()
+        Returns:
+            The new scan ID
+        """
+        with self._write() as conn:
+            cursor = conn.cursor()
+            # One timestamp for every row written by this save
+            now = datetime.now().isoformat()
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                scan_id = self._insert_scan(
+                    cursor, user_id, front_pose, side_pose, physique_analysis, is_baseline, now
+                )
+                if is_baseline:
+                    self._insert_baseline_metrics(cursor, user_id, scan_id, front_pose, now)
+                else:
+                    scores = physique_analysis['scores']
+                    cursor.execute(PROGRESSION_FROM_BASELINE_INSERT, (
+                        user_id,
+                        scan_id,
+                        days_since_baseline,
+                        scores['overall'],
+                        scores.get('shoulders', 0),
+                        scores.get('chest', 0),
+                        scores.get('core', 0),
+                        scores.get('v_taper', 0),
+                        scores.get('symmetry', 0),
+                        scores.get('posture', 0),
+                        scores.get('arms', 0),
+                        now,
+                        user_id
+                    ))
+                cursor.execute('COMMIT')
+            except Exception:
+                cursor.execute('ROLLBACK')
+                raise
+            
+            return scan_id
     
     def get_baseline_scan(self, user_id: str) -> Optional[Dict]:
-        """Get user's baseline scan"""
-        conn = sqlite3.connect(self.db_path, timeout=10.0)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        """Get user's baseline scan, served from memory after the first read"""
+        with self._baseline_cache_lock:
+            scan = self._baseline_cache.get(user_id)
+        if scan is not None:
+            return dict(scan)
         
-        cursor.execute("""
-            SELECT * FROM scans
-            WHERE user_id = ? AND is_baseline = 1
-            LIMIT 1
-        """, (user_id,))
+        with self._read() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT * FROM scans
+                WHERE user_id = ? AND is_baseline = 1
+                LIMIT 1
+            """, (user_id,))
+            
+            row = cursor.fetchone()
         
-        row = cursor.fetchone()
-        conn.close()
+        if row is None:
+            return None
         
-        if row:
-            return dict(row)
-        return None
+        scan = _scan_dict(row)
+        with self._baseline_cache_lock:
+            self._baseline_cache[user_id] = scan
+        return dict(scan)
     
-    def get_user_scans(self, user_id: str, limit: int = 10) -> List[Dict]:
-        """Get user's recent scans"""
-        conn = sqlite3.connect(self.db_path, timeout=10.0)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+    def get_user_scans(self, user_id: str, limit: int = 10, before_scan_id: Optional[int] = None) -> List[Dict]:
+        """
+        Get a page of a user's scans, newest first
         
-        cursor.execute("""
-            SELECT * FROM scans
-            WHERE user_id = ?
-            ORDER BY scan_date DESC
-            LIMIT ?
-        """, (user_id, limit))
-        
-        rows = cursor.fetchall()
-        conn.close()
+        Pass the last scan_id of a page as before_scan_id to get the next one. The page is
+        read in full so the reader goes back to the pool before the caller streams it.
+        """
+        with self._read() as conn:
+            rows = conn.execute("""
+                SELECT * FROM scans INDEXED BY idx_scans_user_cursor
+                WHERE user_id = ? AND scan_id < COALESCE(?, 9223372036854775807)
+                ORDER BY scan_id DESC
+                LIMIT ?
+            """, (user_id, before_scan_id, limit)).fetchall()
         
-        return [dict(row) for row in rows]
+        return [_scan_dict(row) for row in rows]
     
     def get_progression_history(self, user_id: str) -> List[Dict]:
         """Get user's progression history"""
-        conn = sqlite3.connect(self.db_path, timeout=10.0)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT p.*, s.scan_date, s.overall_score
-            FROM progression p
-            JOIN scans s ON p.scan_id = s.scan_id
-            WHERE p.user_id = ?
-            ORDER BY p.days_since_baseline ASC
-        """, (user_id,))
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        return [dict(row) for row in rows]
-
-
-# Global database instance
-db = Database()
-
+        with self._read() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT p.*, s.scan_date, s.overall_score
+                FROM progression p
+                JOIN scans s INDEXED BY idx_scans_cover_progression ON p.scan_id = s.scan_id
+                WHERE p.user_id = ?
+                ORDER BY p.days_since_baseline ASC
+            """, (user_id,))
+            
+            rows = cursor.fetchall()
+            
+            return [dict(row) for row in rows]
+    
+    def get_progression_history_json(self, user_id: str) -> bytes:
+        """Get user's progression history as a JSON array built by SQLite"""
+        with self._read() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT json_group_array(json_object(
+                    'progression_id', progression_id,
+                    'user_id', user_id,
+                    'scan_id', scan_id,
+                    'days_since_baseline', days_since_baseline,
+                    'overall_score_delta', overall_score_delta,
+                    'shoulder_score_delta', shoulder_score_delta,
+                    'chest_score_delta', chest_score_delta,
+                    'core_score_delta', core_score_delta,
+                    'v_taper_score_delta', v_taper_score_delta,
+                    'symmetry_score_delta', symmetry_score_delta,
+                    'posture_score_delta', posture_score_delta,
+                    'arms_score_delta', arms_score_delta,
+                    'notes', notes,
+                    'created_at', created_at,
+                    'scan_date', scan_date,
+                    'overall_score', overall_score
+                ))
+                FROM (
+                    SELECT p.*, s.scan_date, s.overall_score
+                    FROM progression p
+                    JOIN scans s INDEXED BY idx_scans_cover_progression ON p.scan_id = s.scan_id
+                    WHERE p.user_id = ?
+                    ORDER BY p.days_since_baseline ASC
+                )
+            """, (user_id,))
+            
+            return cursor.fetchone()[0].encode()
@@ -0,0 +1,183 @@
+"""
+Pathway Store
+Keeps generated pathways and user progress in Redis so every worker sees the same state,
+falling back to process memory when no Redis URL is configured
+"""
+import threading
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import orjson
+from cachetools import LRUCache, TTLCache
+
+from config import settings
+
+
+# Pathways and progress expire after the longest commitment window we expect users to be active in
+PATHWAY_TTL_SECONDS = 30 * 86400
+
+# Upper bounds for the in-memory fallback; least recently used entries are evicted first
+LOCAL_MAX_PATHWAYS = 10000
+LOCAL_MAX_USERS = 10000
+
+T = TypeVar('T')
+
+
+def _pathway_key(pathway_id: str) -> str:
+    return f"pathway:{pathway_id}"
+
+
+def _progress_key(user_id: str) -> str:
+    return f"user:{user_id}:progress"
+
+
+class PathwayStore:
+    """
+    Key-value store for pathways and per-user progress
+
+    In-memory objects are returned by reference; after mutating one, save it again so
+    cached JSON for it is dropped. The in-memory fallback is bounded and expires entries
+    after PATHWAY_TTL_SECONDS, so an evicted pathway reads as missing.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self._redis = None
+        self._pathways: Dict[str, Dict[str, Any]] = TTLCache(maxsize=LOCAL_MAX_PATHWAYS, ttl=PATHWAY_TTL_SECONDS)
+        self._progress: Dict[str, Dict[str, Any]] = TTLCache(maxsize=LOCAL_MAX_USERS, ttl=PATHWAY_TTL_SECONDS)
+        # Serialized in-memory objects by store key, dropped on every save
+        self._json_cache: Dict[str, bytes] = LRUCache(maxsize=LOCAL_MAX_PATHWAYS + LOCAL_MAX_USERS)
+        # cachetools caches are not thread-safe and handlers run on a threadpool
+        self._lock = threading.Lock()
+        # Serializes update_pathway_and_progress in local mode
+        self._update_lock = threading.Lock()
+
+        if redis_url:
+            import redis
+            self._redis = redis.Redis.from_url(redis_url)
+
+    @property
+    def is_local(self) -> bool:
+        """True when objects live in this process and are returned by reference"""
+        return self._redis is None
+
+    def _get_json(self, key: str, objects: Dict[str, Dict[str, Any]], object_id: str) -> Optional[bytes]:
+        if self._redis is not None:
+            return self._redis.get(key)
+
+        with self._lock:
+            obj = objects.get(object_id)
+            if obj is None:
+                self._json_cache.pop(key, None)
+                return None
+            raw = self._json_cache.get(key)
+            if raw is None:
+                raw = self._json_cache[key] = orjson.dumps(obj)
+            return raw
+
+    def get_pathway(self, pathway_id: str) -> Optional[Dict[str, Any]]:
+        """Get a pathway by ID"""
+        if self._redis is None:
+            with self._lock:
+                return self._pathways.get(pathway_id)
+
+        raw = self._redis.get(_pathway_key(pathway_id))
+        return orjson.loads(raw) if raw is not None else None
+
+    def get_pathway_json(self, pathway_id: str) -> Optional[bytes]:
+        """Get a pathway as serialized JSON, without re-encoding unchanged pathways"""
+        return self._get_json(_pathway_key(pathway_id), self._pathways, pathway_id)
+
+    def save_pathway(self, pathway: Dict[str, Any]):
+        """Create or overwrite a pathway"""
+        key = _pathway_key(pathway['id'])
+        if self._redis is None:
+            with self._lock:
+                self._pathways[pathway['id']] = pathway
+                self._json_cache.pop(key, None)
+            return
+
+        self._redis.set(key, orjson.dumps(pathway), ex=PATHWAY_TTL_SECONDS)
+
+    def get_progress(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get a user's progress"""
+        if self._redis is None:
+            with self._lock:
+                return self._progress.get(user_id)
+
+        raw = self._redis.get(_progress_key(user_id))
+        return orjson.loads(raw) if raw is not None else None
+
+    def get_progress_json(self, user_id: str) -> Optional[bytes]:
+        """Get a user's progress as serialized JSON"""
+        return self._get_json(_progress_key(user_id), self._progress, user_id)
+
+    def save_progress(self, user_id: str, progress: Dict[str, Any]):
+        """Create or overwrite a user's progress"""
+        key = _progress_key(user_id)
+        if self._redis is None:
+            with self._lock:
+                self._progress[user_id] = progress
+                self._json_cache.pop(key, None)
+            return
+
+        self._redis.set(key, orjson.dumps(progress), ex=PATHWAY_TTL_SECONDS)
+
+    def save_pathway_and_progress(self, pathway: Dict[str, Any], user_id: str, progress: Dict[str, Any]):
+        """Write a pathway and a user's progress together in a single round-trip"""
+        if self._redis is None:
+            self.save_pathway(pathway)
+            self.save_progress(user_id, progress)
+            return
+
+        pipe = self._redis.pipeline()
+        pipe.set(_pathway_key(pathway['id']), orjson.dumps(pathway), ex=PATHWAY_TTL_SECONDS)
+        pipe.set(_progress_key(user_id), orjson.dumps(progress), ex=PATHWAY_TTL_SECONDS)
+        pipe.execute()
+
+    def update_pathway_and_progress(
+        self,
+        pathway_id: str,
+        user_id: str,
+        update: Callable[[Optional[Dict[str, Any]], Dict[str, Any]], T]
+    ) -> T:
+        """
+        Read, modify and save a pathway and a user's progress as one atomic step
+
+        update(pathway, progress) mutates both in place and returns the call's result;
+        pathway is None when missing and progress starts empty for a new user. To abort,
+        raise from update before changing anything (in local mode the arguments are the
+        stored objects). In local mode concurrent updates wait on a lock; with Redis both
+        keys are watched and update is re-run on fresh copies whenever another worker
+        changes either key first, so it must not have other side effects.
+        """
+        if self._redis is None:
+            with self._update_lock:
+                pathway = self.get_pathway(pathway_id)
+                progress = self.get_progress(user_id) or {}
+                result = update(pathway, progress)
+                self.save_pathway_and_progress(pathway, user_id, progress)
+                return result
+
+        import redis
+        pathway_key = _pathway_key(pathway_id)
+        progress_key = _progress_key(user_id)
+        with self._redis.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(pathway_key, progress_key)
+                    raw_pathway = pipe.get(pathway_key)
+                    raw_progress = pipe.get(progress_key)
+                    pathway = orjson.loads(raw_pathway) if raw_pathway is not None else None
+                    progress = orjson.loads(raw_progress) if raw_progress is not None else {}
+                    result = update(pathway, progress)
+
+                    pipe.multi()
+                    pipe.set(pathway_key, orjson.dumps(pathway), ex=PATHWAY_TTL_SECONDS)
+                    pipe.set(progress_key, orjson.dumps(progress), ex=PATHWAY_TTL_SECONDS)
+                    pipe.execute()
+                    return result
+                except redis.WatchError:
+                    continue
+
+
+# Global pathway store instance
+pathway_store = PathwayStore(settings.REDIS_URL)
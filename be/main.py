@@ -2,19 +2,44 @@
 FastAPI Backend for Body Composition Scanner
 Main app initialization and router registration only
 """
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+import anyio.to_thread
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import uvicorn
 
 from api.physique import router as physique_router
 from api.pathway import router as pathway_router
 from config import settings
+from database.connection import Database
+from body_analysis import warm_up_kernels
+from services.scoring import warm_up_kernels as warm_up_scoring_kernels
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Size the threadpool, open the database and compile numeric kernels before serving; close connections on shutdown"""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+    # Opened here rather than at import so reloads, workers and test collection only
+    # touch SQLite when an app actually starts
+    app.state.db = Database()
+    app.state.db.warm_up()
+    warm_up_kernels()
+    warm_up_scoring_kernels()
+    yield
+    app.state.db.close_all()
 
 
 app = FastAPI(
     title=settings.API_TITLE,
     description=settings.API_DESCRIPTION,
-    version=settings.API_VERSION
+    version=settings.API_VERSION,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Configure CORS for frontend communication
@@ -31,6 +56,18 @@ app.include_router(physique_router)
 app.include_router(pathway_router, prefix="/api/pathway", tags=["pathway"])
 
 
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """
+    Return 422 for invalid requests
+    
+    Errors echo the rejected input, which may hold NaN or Infinity landmark values; the
+    default handler's JSONResponse cannot encode those and fails with a 500, while orjson
+    writes them as null.
+    """
+    return ORJSONResponse(status_code=422, content={"detail": jsonable_encoder(exc.errors())})
+
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
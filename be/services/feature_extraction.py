@@ -6,31 +6,74 @@ Extracts measurable features from pose landmarks for:
 2. Feeding to LLM for personalized pathway generation
 """
 
-from typing import Dict, List, Any
+from typing import Dict, Any, Optional
+import hashlib
+import logging
 import math
+import threading
 
+import numpy as np
+import orjson
+from cachetools import LRUCache
 
-def calculate_distance(p1: Dict, p2: Dict) -> float:
-    """Calculate Euclidean distance between two landmarks."""
-    return math.sqrt((p1['x'] - p2['x'])**2 + (p1['y'] - p2['y'])**2)
+from utils.jit import njit
+from utils.landmarks import Landmarks, landmarks_to_array
 
 
-def calculate_angle(p1: Dict, p2: Dict, p3: Dict) -> float:
-    """Calculate angle at p2 formed by p1-p2-p3."""
-    v1 = (p1['x'] - p2['x'], p1['y'] - p2['y'])
-    v2 = (p3['x'] - p2['x'], p3['y'] - p2['y'])
+logger = logging.getLogger(__name__)
+
+
+@njit(cache=True)
+def _distance(ax, ay, bx, by):
+    """Euclidean distance between (ax, ay) and (bx, by)"""
+    return math.sqrt((ax - bx)**2 + (ay - by)**2)
+
+
+@njit(cache=True)
+def _angle(ax, ay, bx, by, cx, cy):
+    """Angle in degrees at (bx, by) formed by a-b-c, 0 when a or c coincides with b"""
+    v1x = ax - bx
+    v1y = ay - by
+    v2x = cx - bx
+    v2y = cy - by
     
-    dot = v1[0] * v2[0] + v1[1] * v2[1]
-    mag1 = math.sqrt(v1[0]**2 + v1[1]**2)
-    mag2 = math.sqrt(v2[0]**2 + v2[1]**2)
+    dot = v1x * v2x + v1y * v2y
+    denom = math.sqrt(v1x**2 + v1y**2) * math.sqrt(v2x**2 + v2y**2)
     
-    if mag1 * mag2 == 0:
-        return 0
+    if denom == 0:
+        return 0.0
     
-    cos_angle = max(-1, min(1, dot / (mag1 * mag2)))
+    # Clamp by comparing before dividing; division is monotonic, so this matches clamping the quotient
+    cos_angle = -1.0 if dot < -denom else (1.0 if dot > denom else dot / denom)
     return math.degrees(math.acos(cos_angle))
 
 
+def calculate_angles(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """
+    Angles in degrees at each row of b formed by a-b-c, for (N, 2) point arrays
+    
+    Agrees with calculate_angle row by row to floating-point rounding, including 0 for
+    degenerate rows.
+    """
+    v1 = a - b
+    v2 = c - b
+    dots = (v1 * v2).sum(axis=1)
+    denoms = np.sqrt((v1 * v1).sum(axis=1)) * np.sqrt((v2 * v2).sum(axis=1))
+    degenerate = denoms == 0
+    cos_angles = np.clip(dots / np.where(degenerate, 1.0, denoms), -1.0, 1.0)
+    return np.where(degenerate, 0.0, np.degrees(np.arccos(cos_angles)))
+
+
+def calculate_distance(p1: Dict, p2: Dict) -> float:
+    """Calculate Euclidean distance between two landmarks."""
+    return _distance(p1['x'], p1['y'], p2['x'], p2['y'])
+
+
+def calculate_angle(p1: Dict, p2: Dict, p3: Dict) -> float:
+    """Calculate angle at p2 formed by p1-p2-p3."""
+    return _angle(p1['x'], p1['y'], p2['x'], p2['y'], p3['x'], p3['y'])
+
+
 # MediaPipe landmark indices
 LANDMARKS = {
     'nose': 0,
@@ -52,8 +95,84 @@ LANDMARKS = {
     'right_ankle': 28,
 }
 
+# Front-pose landmarks gathered once per extraction; the ankle midpoint is appended after them
+KEY_POINTS = (
+    'left_shoulder', 'right_shoulder', 'left_hip', 'right_hip',
+    'left_ankle', 'right_ankle', 'left_wrist', 'right_wrist', 'nose',
+)
+KEY_POINT_INDICES = np.array([LANDMARKS[name] for name in KEY_POINTS])
+# Shortest front pose that contains every key point
+MIN_FRONT_LANDMARKS = int(KEY_POINT_INDICES.max()) + 1
+KEY_ROWS = {name: row for row, name in enumerate(KEY_POINTS + ('ankle_midpoint',))}
+ANKLE_ROWS = np.array([KEY_ROWS['left_ankle'], KEY_ROWS['right_ankle']])
+
+# Segments measured in one batched pass over the key points, in the order they are unpacked
+FRONT_SEGMENTS = (
+    ('left_shoulder', 'right_shoulder'),  # shoulder width
+    ('left_hip', 'right_hip'),            # hip width
+    ('left_shoulder', 'left_hip'),        # torso
+    ('right_shoulder', 'right_hip'),
+    ('left_hip', 'left_ankle'),           # leg
+    ('right_hip', 'right_ankle'),
+    ('left_shoulder', 'left_wrist'),      # arm
+    ('right_shoulder', 'right_wrist'),
+    ('nose', 'ankle_midpoint'),           # body height
+)
+SEGMENT_PAIRS = np.array([(KEY_ROWS[start], KEY_ROWS[end]) for start, end in FRONT_SEGMENTS], dtype=np.intp)
+SEGMENT_STARTS = SEGMENT_PAIRS[:, 0]
+SEGMENT_ENDS = SEGMENT_PAIRS[:, 1]
+
+# Output keys, in the order their values are rounded together
+RAW_MEASUREMENT_KEYS = ('shoulder_width', 'hip_width', 'torso_length', 'leg_length', 'body_height')
+RATIO_KEYS = ('shoulder_hip_ratio', 'shoulder_waist_ratio', 'torso_leg_ratio', 'symmetry')
+
+# Side-pose landmarks read by calculate_posture_score: ear, shoulder, hip
+POSTURE_POINTS = np.array([LANDMARKS['left_ear'], LANDMARKS['left_shoulder'], LANDMARKS['left_hip']])
+
+# Side-pose joint angles as (name, (end, vertex, end)), measured in one batched pass
+POSTURE_JOINTS = (
+    ('neck', ('left_ear', 'left_shoulder', 'left_hip')),
+    ('hip', ('left_shoulder', 'left_hip', 'left_knee')),
+    ('knee', ('left_hip', 'left_knee', 'left_ankle')),
+)
+POSTURE_JOINT_NAMES = tuple(name for name, _ in POSTURE_JOINTS)
+POSTURE_TRIPLETS = np.array([[LANDMARKS[point] for point in triplet] for _, triplet in POSTURE_JOINTS])
+
+
+# General focus areas appended after the measured ones, copied per extraction
+GENDER_FOCUS_AREAS = {
+    'male': (
+        {'area': 'chest', 'priority': 'medium', 'recommendation': 'Bench press variations, push-ups, flyes'},
+        {'area': 'arms', 'priority': 'low', 'recommendation': 'Compound movements + isolation work'},
+    ),
+}
+# Every other gender
+DEFAULT_GENDER_FOCUS_AREAS = (
+    {'area': 'glutes', 'priority': 'medium', 'recommendation': 'Hip thrusts, squats, lunges'},
+    {'area': 'core', 'priority': 'medium', 'recommendation': 'Planks, dead bugs, ab work'},
+)
+
+# Recent extractions by pose fingerprint, stored as JSON so every hit decodes a private copy
+FEATURE_CACHE_SIZE = 128
+_feature_cache: Dict[bytes, bytes] = LRUCache(maxsize=FEATURE_CACHE_SIZE)
+_feature_cache_lock = threading.Lock()
+
+
+def _feature_cache_key(front: np.ndarray, side: np.ndarray, gender: str) -> Optional[bytes]:
+    """Fingerprint of the exact landmark values and gender, or None when they cannot be cached"""
+    if not (np.isfinite(front).all() and np.isfinite(side).all()):
+        # NaN does not survive the JSON round trip
+        return None
+    
+    key = hashlib.blake2b(digest_size=16)
+    for arr in (front, side):
+        key.update(len(arr).to_bytes(4, 'little'))
+        key.update(np.ascontiguousarray(arr, dtype=np.float64).tobytes())
+    key.update(gender.encode())
+    return key.digest()
+
 
-def extract_body_features(front_pose: List[Dict], side_pose: List[Dict], gender: str = 'male') -> Dict[str, Any]:
+def extract_body_features(front_pose: Landmarks, side_pose: Landmarks, gender: str = 'male') -> Dict[str, Any]:
     """
     Extract comprehensive body features from front and side pose landmarks.
     
@@ -61,58 +180,69 @@ def extract_body_features(front_pose: List[Dict], side_pose: List[Dict], gender:
     1. Stored in database
     2. Fed to LLM for pathway generation
     3. Used for progress tracking over time
+    
+    Repeated calls with identical poses (e.g. regenerating a pathway with a different
+    commitment) are served from a small cache; callers always get their own copy.
     """
+    try:
+        front = landmarks_to_array(front_pose)
+        side = landmarks_to_array(side_pose)
+    except ValueError:
+        # Malformed landmarks take the default-features path uncached
+        return _extract_body_features(front_pose, side_pose, gender)
     
+    key = _feature_cache_key(front, side, gender)
+    if key is not None:
+        with _feature_cache_lock:
+            cached = _feature_cache.get(key)
+        if cached is not None:
+            return orjson.loads(cached)
+    
+    features = _extract_body_features(front, side, gender)
+    if key is not None:
+        with _feature_cache_lock:
+            _feature_cache[key] = orjson.dumps(features)
+    return features
+
+
+def _extract_body_features(front_pose: Landmarks, side_pose: Landmarks, gender: str) -> Dict[str, Any]:
+    """Uncached body of extract_body_features"""
     features = {
         'raw_measurements': {},
         'ratios': {},
         'scores': {},
+        'posture_angles': {},
         'insights': [],
         'focus_areas': [],
     }
     
+    # Frames missing key landmarks get the baseline assessment without any numeric work
+    if len(front_pose) < MIN_FRONT_LANDMARKS:
+        return _set_default_features(features)
+    
     try:
-        # Get key landmarks from front pose
-        left_shoulder = front_pose[LANDMARKS['left_shoulder']]
-        right_shoulder = front_pose[LANDMARKS['right_shoulder']]
-        left_hip = front_pose[LANDMARKS['left_hip']]
-        right_hip = front_pose[LANDMARKS['right_hip']]
-        left_knee = front_pose[LANDMARKS['left_knee']]
-        right_knee = front_pose[LANDMARKS['right_knee']]
-        left_ankle = front_pose[LANDMARKS['left_ankle']]
-        right_ankle = front_pose[LANDMARKS['right_ankle']]
-        nose = front_pose[LANDMARKS['nose']]
+        # x, y of the key front landmarks
+        points = landmarks_to_array(front_pose)[KEY_POINT_INDICES, :2]
+        points = np.vstack((points, points[ANKLE_ROWS].mean(axis=0)))
         
         # === RAW MEASUREMENTS (normalized to body height) ===
         
-        # Shoulder width
-        shoulder_width = calculate_distance(left_shoulder, right_shoulder)
-        
-        # Hip width
-        hip_width = calculate_distance(left_hip, right_hip)
-        
-        # Torso length (shoulder to hip)
-        torso_length = (calculate_distance(left_shoulder, left_hip) + 
-                       calculate_distance(right_shoulder, right_hip)) / 2
+        diffs = points[SEGMENT_STARTS] - points[SEGMENT_ENDS]
         
-        # Leg length (hip to ankle)
-        leg_length = (calculate_distance(left_hip, left_ankle) + 
-                     calculate_distance(right_hip, right_ankle)) / 2
+        # Shoulder and hip width, torso (shoulder to hip), leg (hip to ankle) and
+        # arm (shoulder to wrist) lengths per side, and body height (nose to ankle midpoint)
+        (shoulder_width, hip_width,
+         left_torso, right_torso,
+         left_leg, right_leg,
+         left_arm_length, right_arm_length,
+         body_height) = np.sqrt((diffs * diffs).sum(axis=1)).tolist()
+        torso_length = (left_torso + right_torso) / 2
+        leg_length = (left_leg + right_leg) / 2
         
-        # Body height estimate (nose to ankle midpoint)
-        ankle_midpoint = {
-            'x': (left_ankle['x'] + right_ankle['x']) / 2,
-            'y': (left_ankle['y'] + right_ankle['y']) / 2
-        }
-        body_height = calculate_distance(nose, ankle_midpoint)
-        
-        features['raw_measurements'] = {
-            'shoulder_width': round(shoulder_width, 4),
-            'hip_width': round(hip_width, 4),
-            'torso_length': round(torso_length, 4),
-            'leg_length': round(leg_length, 4),
-            'body_height': round(body_height, 4),
-        }
+        features['raw_measurements'] = dict(zip(
+            RAW_MEASUREMENT_KEYS,
+            np.round([shoulder_width, hip_width, torso_length, leg_length, body_height], 4).tolist()
+        ))
         
         # === RATIOS (key for physique analysis) ===
         
@@ -126,23 +256,15 @@ def extract_body_features(front_pose: List[Dict], side_pose: List[Dict], gender:
         # Torso-to-leg ratio
         torso_leg_ratio = torso_length / leg_length if leg_length > 0 else 0
         
-        # Symmetry score (left vs right comparison)
-        left_arm_length = calculate_distance(
-            front_pose[LANDMARKS['left_shoulder']], 
-            front_pose[LANDMARKS['left_wrist']]
-        )
-        right_arm_length = calculate_distance(
-            front_pose[LANDMARKS['right_shoulder']], 
-            front_pose[LANDMARKS['right_wrist']]
-        )
-        symmetry = 1 - abs(left_arm_length - right_arm_length) / max(left_arm_length, right_arm_length, 0.001)
-        
-        features['ratios'] = {
-            'shoulder_hip_ratio': round(shoulder_hip_ratio, 3),
-            'shoulder_waist_ratio': round(shoulder_waist_ratio, 3),
-            'torso_leg_ratio': round(torso_leg_ratio, 3),
-            'symmetry': round(symmetry, 3),
-        }
+        # Symmetry score (left vs right arm length)
+        arm_denom = left_arm_length if left_arm_length > right_arm_length else right_arm_length
+        arm_denom = arm_denom if arm_denom > 0.001 else 0.001
+        symmetry = 1.0 - abs(left_arm_length - right_arm_length) / arm_denom
+        
+        features['ratios'] = dict(zip(
+            RATIO_KEYS,
+            np.round([shoulder_hip_ratio, shoulder_waist_ratio, torso_leg_ratio, symmetry], 3).tolist()
+        ))
         
         # === SCORES (0-100 scale) ===
         
@@ -153,8 +275,9 @@ def extract_body_features(front_pose: List[Dict], side_pose: List[Dict], gender:
         # Symmetry score
         symmetry_score = symmetry * 100
         
-        # Posture score (from side pose if available)
+        # Posture score and joint angles (from side pose if available)
         posture_score = calculate_posture_score(side_pose)
+        features['posture_angles'] = calculate_posture_angles(side_pose)
         
         # Overall physique score
         overall_score = (vtaper_score * 0.35 + symmetry_score * 0.25 + posture_score * 0.40)
@@ -224,54 +347,35 @@ def extract_body_features(front_pose: List[Dict], side_pose: List[Dict], gender:
             })
         
         # Add general areas based on gender preferences
-        if gender == 'male':
-            focus_areas.append({
-                'area': 'chest',
-                'priority': 'medium',
-                'recommendation': 'Bench press variations, push-ups, flyes'
-            })
-            focus_areas.append({
-                'area': 'arms',
-                'priority': 'low',
-                'recommendation': 'Compound movements + isolation work'
-            })
-        else:
-            focus_areas.append({
-                'area': 'glutes',
-                'priority': 'medium',
-                'recommendation': 'Hip thrusts, squats, lunges'
-            })
-            focus_areas.append({
-                'area': 'core',
-                'priority': 'medium',
-                'recommendation': 'Planks, dead bugs, ab work'
-            })
+        focus_areas.extend(dict(area) for area in GENDER_FOCUS_AREAS.get(gender, DEFAULT_GENDER_FOCUS_AREAS))
         
         features['focus_areas'] = focus_areas
         
-    except Exception as e:
-        print(f"Feature extraction error: {e}")
+    except (KeyError, IndexError, ValueError, ZeroDivisionError) as e:
+        logger.warning("Feature extraction error: %s", e)
         # Return default features on error
-        features['scores'] = {'overall': 70, 'vtaper': 70, 'symmetry': 80, 'posture': 70}
-        features['insights'] = ["Unable to fully analyze - using baseline assessment"]
-        features['focus_areas'] = [{'area': 'general fitness', 'priority': 'medium', 'recommendation': 'Full body training'}]
+        _set_default_features(features)
     
     return features
 
 
-def calculate_posture_score(side_pose: List[Dict]) -> float:
+def _set_default_features(features: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill in the baseline assessment used when a pose cannot be analyzed"""
+    features['scores'] = {'overall': 70, 'vtaper': 70, 'symmetry': 80, 'posture': 70}
+    features['insights'] = ["Unable to fully analyze - using baseline assessment"]
+    features['focus_areas'] = [{'area': 'general fitness', 'priority': 'medium', 'recommendation': 'Full body training'}]
+    return features
+
+
+def calculate_posture_score(side_pose: Landmarks) -> float:
     """Calculate posture score from side view landmarks."""
     try:
-        ear = side_pose[LANDMARKS['left_ear']]
-        shoulder = side_pose[LANDMARKS['left_shoulder']]
-        hip = side_pose[LANDMARKS['left_hip']]
-        knee = side_pose[LANDMARKS['left_knee']]
-        ankle = side_pose[LANDMARKS['left_ankle']]
+        ear_x, shoulder_x, hip_x = landmarks_to_array(side_pose)[POSTURE_POINTS, 0].tolist()
         
         # Ideal posture: ear, shoulder, hip roughly vertically aligned
         # Calculate horizontal deviation
-        ear_shoulder_deviation = abs(ear['x'] - shoulder['x'])
-        shoulder_hip_deviation = abs(shoulder['x'] - hip['x'])
+        ear_shoulder_deviation = abs(ear_x - shoulder_x)
+        shoulder_hip_deviation = abs(shoulder_x - hip_x)
         
         # Lower deviation = better posture
         total_deviation = ear_shoulder_deviation + shoulder_hip_deviation
@@ -284,41 +388,63 @@ def calculate_posture_score(side_pose: List[Dict]) -> float:
         return 70  # Default score
 
 
+def calculate_posture_angles(side_pose: Landmarks) -> Dict[str, float]:
+    """Neck, hip and knee angles in degrees from side view landmarks, empty when they are missing."""
+    side_xy = landmarks_to_array(side_pose)[:, :2]
+    if len(side_xy) <= POSTURE_TRIPLETS.max():
+        return {}
+    
+    angles = calculate_angles(
+        side_xy[POSTURE_TRIPLETS[:, 0]],
+        side_xy[POSTURE_TRIPLETS[:, 1]],
+        side_xy[POSTURE_TRIPLETS[:, 2]],
+    )
+    return dict(zip(POSTURE_JOINT_NAMES, np.round(angles, 1).tolist()))
+
+
 def features_to_llm_prompt(features: Dict[str, Any], user_data: Dict) -> str:
     """
     Convert extracted features to a prompt for LLM pathway generation.
     """
-    prompt = f"""Based on the following body analysis, create a personalized fitness pathway:
-
-USER PROFILE:
-- Gender: {user_data.get('gender', 'male')}
-- Age: {user_data.get('age', 25)}
-- Height: {user_data.get('height', 175)}cm
-- Commitment: {user_data.get('commitment_days', 30)} days
-
-BODY ANALYSIS SCORES:
-- Overall Score: {features['scores'].get('overall', 70)}/100
-- V-Taper Score: {features['scores'].get('vtaper', 70)}/100
-- Symmetry Score: {features['scores'].get('symmetry', 80)}/100
-- Posture Score: {features['scores'].get('posture', 70)}/100
-
-KEY RATIOS:
-- Shoulder-to-Hip Ratio: {features['ratios'].get('shoulder_hip_ratio', 1.4)}
-- Symmetry: {features['ratios'].get('symmetry', 0.95)}
-
-INSIGHTS:
-{chr(10).join('- ' + insight for insight in features.get('insights', []))}
-
-FOCUS AREAS:
-{chr(10).join(f"- {area['area'].upper()} ({area['priority']} priority): {area['recommendation']}" for area in features.get('focus_areas', []))}
-
-Please generate a personalized {user_data.get('commitment_days', 30)}-day pathway with daily stages. Each stage should include:
-1. A workout or exercise focus
-2. A nutrition tip
-3. A mindset/habit focus
-4. XP points (10-50 based on difficulty)
-
-Format as JSON array of daily stages.
-"""
-    return prompt
-
+    scores = features['scores']
+    ratios = features['ratios']
+    commitment_days = user_data.get('commitment_days', 30)
+    
+    parts = [
+        "Based on the following body analysis, create a personalized fitness pathway:",
+        "",
+        "USER PROFILE:",
+        f"- Gender: {user_data.get('gender', 'male')}",
+        f"- Age: {user_data.get('age', 25)}",
+        f"- Height: {user_data.get('height', 175)}cm",
+        f"- Commitment: {commitment_days} days",
+        "",
+        "BODY ANALYSIS SCORES:",
+        f"- Overall Score: {scores.get('overall', 70)}/100",
+        f"- V-Taper Score: {scores.get('vtaper', 70)}/100",
+        f"- Symmetry Score: {scores.get('symmetry', 80)}/100",
+        f"- Posture Score: {scores.get('posture', 70)}/100",
+        "",
+        "KEY RATIOS:",
+        f"- Shoulder-to-Hip Ratio: {ratios.get('shoulder_hip_ratio', 1.4)}",
+        f"- Symmetry: {ratios.get('symmetry', 0.95)}",
+        "",
+        "INSIGHTS:",
+        "\n".join(f"- {insight}" for insight in features.get('insights') or ()),
+        "",
+        "FOCUS AREAS:",
+        "\n".join(
+            f"- {area['area'].upper()} ({area['priority']} priority): {area['recommendation']}"
+            for area in features.get('focus_areas') or ()
+        ),
+        "",
+        f"Please generate a personalized {commitment_days}-day pathway with daily stages. Each stage should include:",
+        "1. A workout or exercise focus",
+        "2. A nutrition tip",
+        "3. A mindset/habit focus",
+        "4. XP points (10-50 based on difficulty)",
+        "",
+        "Format as JSON array of daily stages.",
+        "",
+    ]
+    return "\n".join(parts)
@@ -7,17 +7,191 @@ Creates personalized Duolingo-style improvement pathways based on:
 3. Commitment period
 """
 
+import bisect
 import json
 import os
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import random
+import time
 
 # For actual LLM integration, you would use:
 # import openai
 # openai.api_key = os.getenv('OPENAI_API_KEY')
 
 
+# Workout, nutrition and mindset content shared by every pathway. Stages reference these
+# objects rather than copying them, so treat them as read-only.
+PUSH_TEMPLATE = {
+    'name': 'Push Day',
+    'description': 'Chest, shoulders, and triceps focus',
+    'duration': 45,
+    'xp': 30,
+    'exercises': (
+        {'name': 'Bench Press', 'sets': 4, 'reps': '8-10'},
+        {'name': 'Overhead Press', 'sets': 3, 'reps': '8-10'},
+        {'name': 'Incline Dumbbell Press', 'sets': 3, 'reps': '10-12'},
+        {'name': 'Lateral Raises', 'sets': 3, 'reps': '12-15'},
+        {'name': 'Tricep Pushdowns', 'sets': 3, 'reps': '12-15'},
+    )
+}
+
+PULL_TEMPLATE = {
+    'name': 'Pull Day',
+    'description': 'Back and biceps focus',
+    'duration': 45,
+    'xp': 30,
+    'exercises': (
+        {'name': 'Pull-ups/Lat Pulldown', 'sets': 4, 'reps': '8-10'},
+        {'name': 'Barbell Rows', 'sets': 4, 'reps': '8-10'},
+        {'name': 'Face Pulls', 'sets': 3, 'reps': '15-20'},
+        {'name': 'Dumbbell Curls', 'sets': 3, 'reps': '10-12'},
+        {'name': 'Rear Delt Flyes', 'sets': 3, 'reps': '12-15'},
+    )
+}
+
+LEGS_TEMPLATE = {
+    'name': 'Leg Day',
+    'description': 'Quadriceps, hamstrings, and glutes',
+    'duration': 50,
+    'xp': 35,
+    'exercises': (
+        {'name': 'Squats', 'sets': 4, 'reps': '8-10'},
+        {'name': 'Romanian Deadlifts', 'sets': 3, 'reps': '10-12'},
+        {'name': 'Leg Press', 'sets': 3, 'reps': '10-12'},
+        {'name': 'Walking Lunges', 'sets': 3, 'reps': '12 each'},
+        {'name': 'Calf Raises', 'sets': 4, 'reps': '15-20'},
+    )
+}
+
+CORE_POSTURE_TEMPLATE = {
+    'name': 'Core & Posture',
+    'description': 'Core strengthening and postural correction',
+    'duration': 30,
+    'xp': 25,
+    'exercises': (
+        {'name': 'Planks', 'sets': 3, 'reps': '45-60 sec'},
+        {'name': 'Dead Bugs', 'sets': 3, 'reps': '10 each side'},
+        {'name': 'Bird Dogs', 'sets': 3, 'reps': '10 each side'},
+        {'name': 'Back Extensions', 'sets': 3, 'reps': '12-15'},
+        {'name': 'Pallof Press', 'sets': 3, 'reps': '10 each side'},
+    )
+}
+
+HIIT_TEMPLATE = {
+    'name': 'HIIT Conditioning',
+    'description': 'High-intensity interval training for fat loss',
+    'duration': 25,
+    'xp': 30,
+    'exercises': (
+        {'name': 'Burpees', 'sets': 4, 'reps': '30 sec on/30 sec off'},
+        {'name': 'Mountain Climbers', 'sets': 4, 'reps': '30 sec on/30 sec off'},
+        {'name': 'Jump Squats', 'sets': 4, 'reps': '30 sec on/30 sec off'},
+        {'name': 'High Knees', 'sets': 4, 'reps': '30 sec on/30 sec off'},
+    )
+}
+
+SHOULDER_FOCUS_TEMPLATE = {
+    'name': 'Shoulder Specialization',
+    'description': 'Extra focus on building wider shoulders',
+    'duration': 40,
+    'xp': 30,
+    'exercises': (
+        {'name': 'Overhead Press', 'sets': 4, 'reps': '6-8'},
+        {'name': 'Lateral Raises', 'sets': 5, 'reps': '12-15'},
+        {'name': 'Cable Lateral Raises', 'sets': 3, 'reps': '12-15'},
+        {'name': 'Face Pulls', 'sets': 4, 'reps': '15-20'},
+        {'name': 'Upright Rows', 'sets': 3, 'reps': '10-12'},
+    )
+}
+
+NUTRITION_TIPS = (
+    "Focus on protein: Aim for 0.8-1g per pound of body weight",
+    "Stay hydrated: Drink at least 8 glasses of water today",
+    "Eat the rainbow: Include colorful vegetables in your meals",
+    "Time your carbs: Prioritize complex carbs around workouts",
+    "Healthy fats matter: Include avocado, nuts, or olive oil",
+    "Meal prep tip: Prepare tomorrow's meals today",
+    "Mindful eating: Put away your phone during meals",
+    "Protein timing: Have protein within 2 hours post-workout",
+    "Fiber focus: Aim for 25-35g of fiber today",
+    "Limit processed foods: Choose whole foods when possible",
+)
+
+MINDSET_TASKS = (
+    {'title': 'Morning Visualization', 'description': 'Spend 5 minutes visualizing your ideal physique'},
+    {'title': 'Gratitude Journal', 'description': 'Write 3 things you appreciate about your body'},
+    {'title': 'Progress Photo', 'description': 'Take a quick mirror selfie to track changes'},
+    {'title': 'Sleep Optimization', 'description': 'Get 7-8 hours of quality sleep tonight'},
+    {'title': 'Stress Management', 'description': '10 minutes of meditation or deep breathing'},
+    {'title': 'Goal Review', 'description': 'Review your transformation goals'},
+    {'title': 'Positive Affirmations', 'description': 'Repeat 3 positive statements about your journey'},
+)
+
+
+# Pathway titles by overall-score tier: 80+, 60-79, below 60
+PATHWAY_TITLES = (
+    ("Elite Physique Refinement", "Advanced Aesthetics Journey", "Peak Performance Path"),
+    ("Body Transformation Journey", "Physique Evolution Path", "Athletic Build Program"),
+    ("Foundation Builder", "Transformation Starter", "New You Journey"),
+)
+
+# Milestone templates ordered by day; the first ALWAYS_INCLUDED_MILESTONES are part of every
+# pathway, later ones only when the commitment reaches their day
+MILESTONES = (
+    {
+        'id': 'first_workout',
+        'title': '🎯 First Step',
+        'description': 'Complete your first workout',
+        'day': 1,
+        'xp_bonus': 50,
+        'achieved': False,
+    },
+    {
+        'id': 'week_1',
+        'title': '🔥 Week 1 Complete',
+        'description': 'Finish your first week',
+        'day': 7,
+        'xp_bonus': 100,
+        'achieved': False,
+    },
+    {
+        'id': 'first_assessment',
+        'title': '📊 First Progress Check',
+        'description': 'Complete your first progress assessment',
+        'day': 14,
+        'xp_bonus': 150,
+        'achieved': False,
+    },
+    {
+        'id': 'month_1',
+        'title': '🏆 Month 1 Champion',
+        'description': 'Complete 30 days of transformation',
+        'day': 30,
+        'xp_bonus': 300,
+        'achieved': False,
+    },
+    {
+        'id': 'quarter',
+        'title': '💎 Quarter Master',
+        'description': 'Complete 90 days - a new habit is formed!',
+        'day': 90,
+        'xp_bonus': 500,
+        'achieved': False,
+    },
+    {
+        'id': 'year',
+        'title': '👑 Year of Transformation',
+        'description': 'Complete a full year of dedication',
+        'day': 365,
+        'xp_bonus': 2000,
+        'achieved': False,
+    },
+)
+MILESTONE_DAYS = tuple(m['day'] for m in MILESTONES)
+ALWAYS_INCLUDED_MILESTONES = 2
+
+
 def generate_pathway(
     features: Dict[str, Any],
     user_data: Dict[str, Any],
@@ -30,10 +204,12 @@ def generate_pathway(
     For Production: Would use GPT-4 or similar LLM
     """
     
+    now = datetime.now()
     pathway = {
-        'id': f"pathway_{datetime.now().strftime('%Y%m%d%H%M%S')}",
+        # Nanosecond clock: no strftime, and requests in the same second no longer share an id
+        'id': f"pathway_{time.time_ns():x}",
         'user_id': user_data.get('user_id', 'demo_user'),
-        'created_at': datetime.now().isoformat(),
+        'created_at': now.isoformat(),
         'commitment_days': commitment_days,
         'title': generate_pathway_title(features, user_data),
         'description': generate_pathway_description(features),
@@ -43,10 +219,13 @@ def generate_pathway(
         'focus_areas': features.get('focus_areas', []),
     }
     
-    # Generate daily stages
-    stages = generate_daily_stages(features, user_data, commitment_days)
-    pathway['stages'] = stages
-    pathway['total_xp'] = sum(stage['xp'] for stage in stages)
+    # Generate daily stages, totalling XP as they are built
+    stages = pathway['stages']
+    total_xp = 0
+    for stage in iter_daily_stages(features, user_data, commitment_days):
+        total_xp += stage['xp']
+        stages.append(stage)
+    pathway['total_xp'] = total_xp
     
     # Generate milestones
     pathway['milestones'] = generate_milestones(commitment_days)
@@ -60,26 +239,9 @@ def generate_pathway_title(features: Dict, user_data: Dict) -> str:
     overall_score = features.get('scores', {}).get('overall', 70)
     gender = user_data.get('gender', 'male')
     
-    if overall_score >= 80:
-        titles = [
-            "Elite Physique Refinement",
-            "Advanced Aesthetics Journey",
-            "Peak Performance Path"
-        ]
-    elif overall_score >= 60:
-        titles = [
-            "Body Transformation Journey",
-            "Physique Evolution Path",
-            "Athletic Build Program"
-        ]
-    else:
-        titles = [
-            "Foundation Builder",
-            "Transformation Starter",
-            "New You Journey"
-        ]
-    
-    return random.choice(titles)
+    tier = 0 if overall_score >= 80 else (1 if overall_score >= 60 else 2)
+    titles = PATHWAY_TITLES[tier]
+    return titles[random.randrange(len(titles))]
 
 
 def generate_pathway_description(features: Dict) -> str:
@@ -95,14 +257,13 @@ def generate_pathway_description(features: Dict) -> str:
     return "A comprehensive program designed to enhance your physique through targeted workouts, nutrition guidance, and mindset development."
 
 
-def generate_daily_stages(
+def iter_daily_stages(
     features: Dict,
     user_data: Dict,
     commitment_days: int
-) -> List[Dict]:
-    """Generate all daily stages for the pathway."""
+) -> Iterator[Dict]:
+    """Yield the pathway's daily stages in order, one at a time."""
     
-    stages = []
     focus_areas = features.get('focus_areas', [])
     
     # Workout templates based on focus areas
@@ -110,10 +271,43 @@ def generate_daily_stages(
     
     # Generate each day's stage
     for day in range(1, commitment_days + 1):
-        stage = generate_single_stage(day, commitment_days, workout_templates, features)
-        stages.append(stage)
-    
-    return stages
+        yield generate_single_stage(day, commitment_days, workout_templates, features)
+
+
+def generate_daily_stages(
+    features: Dict,
+    user_data: Dict,
+    commitment_days: int
+) -> List[Dict]:
+    """Generate all daily stages for the pathway."""
+    return list(iter_daily_stages(features, user_data, commitment_days))
+
+
+def _workout_stage_header(day: int, workout_templates: List[Dict]) -> Tuple[str, int]:
+    workout = workout_templates[(day - 1) % len(workout_templates)]
+    return workout['name'], workout.get('xp', 30)
+
+
+def _recovery_stage_header(day: int, workout_templates: List[Dict]) -> Tuple[str, int]:
+    return "Active Recovery Day", 15
+
+
+def _assessment_stage_header(day: int, workout_templates: List[Dict]) -> Tuple[str, int]:
+    return f"Progress Check #{day // 14}", 50
+
+
+# Stage type by day % 14: every 14th day is assessment, every other 7th day is rest
+STAGE_TYPE_CYCLE = tuple(
+    'assessment' if d == 0 else 'recovery' if d % 7 == 0 else 'workout'
+    for d in range(14)
+)
+
+# (title, xp) builder for each stage type
+STAGE_HEADERS = {
+    'workout': _workout_stage_header,
+    'recovery': _recovery_stage_header,
+    'assessment': _assessment_stage_header,
+}
 
 
 def generate_single_stage(
@@ -125,22 +319,8 @@ def generate_single_stage(
     """Generate a single day's stage."""
     
     # Determine stage type based on day
-    is_rest_day = day % 7 == 0  # Every 7th day is rest
-    is_assessment_day = day % 14 == 0  # Every 14th day is assessment
-    
-    if is_assessment_day:
-        stage_type = 'assessment'
-        title = f"Progress Check #{day // 14}"
-        xp = 50
-    elif is_rest_day:
-        stage_type = 'recovery'
-        title = "Active Recovery Day"
-        xp = 15
-    else:
-        stage_type = 'workout'
-        workout_idx = (day - 1) % len(workout_templates)
-        title = workout_templates[workout_idx]['name']
-        xp = workout_templates[workout_idx].get('xp', 30)
+    stage_type = STAGE_TYPE_CYCLE[day % len(STAGE_TYPE_CYCLE)]
+    title, xp = STAGE_HEADERS[stage_type](day, workout_templates)
     
     # Progress through difficulty
     difficulty = get_difficulty_for_day(day, total_days)
@@ -181,295 +361,130 @@ def generate_stage_tasks(
 ) -> List[Dict]:
     """Generate tasks for a stage (like Duolingo lessons)."""
     
-    tasks = []
-    
     if stage_type == 'workout':
-        workout_idx = (day - 1) % len(workout_templates)
-        workout = workout_templates[workout_idx]
-        
-        # Workout task
-        tasks.append({
-            'id': f"task_{day}_workout",
-            'type': 'workout',
-            'title': workout['name'],
-            'description': workout['description'],
-            'exercises': workout.get('exercises', []),
-            'duration_minutes': workout.get('duration', 30),
-            'xp': 20,
-            'completed': False,
-        })
-        
-        # Nutrition task
-        tasks.append({
-            'id': f"task_{day}_nutrition",
-            'type': 'nutrition',
-            'title': 'Log Your Meals',
-            'description': get_nutrition_tip(day),
-            'xp': 5,
-            'completed': False,
-        })
-        
-        # Mindset task
-        tasks.append({
-            'id': f"task_{day}_mindset",
-            'type': 'mindset',
-            'title': get_mindset_task(day)['title'],
-            'description': get_mindset_task(day)['description'],
-            'xp': 5,
-            'completed': False,
-        })
-        
-    elif stage_type == 'recovery':
-        tasks.append({
-            'id': f"task_{day}_stretch",
-            'type': 'stretch',
-            'title': 'Mobility Routine',
-            'description': '15-minute stretching and mobility work',
-            'duration_minutes': 15,
-            'xp': 10,
-            'completed': False,
-        })
-        
-        tasks.append({
-            'id': f"task_{day}_reflect",
-            'type': 'reflection',
-            'title': 'Weekly Reflection',
-            'description': 'Review your progress and set intentions for next week',
-            'xp': 5,
-            'completed': False,
-        })
+        workout = workout_templates[(day - 1) % len(workout_templates)]
+        mindset = get_mindset_task(day)
         
-    elif stage_type == 'assessment':
-        tasks.append({
-            'id': f"task_{day}_photos",
-            'type': 'photos',
-            'title': 'Progress Photos',
-            'description': 'Take new front and side photos to track changes',
-            'xp': 30,
-            'completed': False,
-        })
-        
-        tasks.append({
-            'id': f"task_{day}_measurements",
-            'type': 'measurements',
-            'title': 'Body Measurements',
-            'description': 'Record weight and key measurements',
-            'xp': 10,
-            'completed': False,
-        })
-        
-        tasks.append({
-            'id': f"task_{day}_review",
-            'type': 'review',
-            'title': 'AI Progress Analysis',
-            'description': 'Review your transformation with AI insights',
-            'xp': 10,
-            'completed': False,
-        })
-    
-    return tasks
-
-
-def get_workout_templates(focus_areas: List[Dict], gender: str) -> List[Dict]:
-    """Get workout templates based on focus areas."""
-    
-    templates = []
-    
-    # Base templates
-    push_template = {
-        'name': 'Push Day',
-        'description': 'Chest, shoulders, and triceps focus',
-        'duration': 45,
-        'xp': 30,
-        'exercises': [
-            {'name': 'Bench Press', 'sets': 4, 'reps': '8-10'},
-            {'name': 'Overhead Press', 'sets': 3, 'reps': '8-10'},
-            {'name': 'Incline Dumbbell Press', 'sets': 3, 'reps': '10-12'},
-            {'name': 'Lateral Raises', 'sets': 3, 'reps': '12-15'},
-            {'name': 'Tricep Pushdowns', 'sets': 3, 'reps': '12-15'},
+        return [
+            # Workout task
+            {
+                'id': f"task_{day}_workout",
+                'type': 'workout',
+                'title': workout['name'],
+                'description': workout['description'],
+                'exercises': workout.get('exercises', []),
+                'duration_minutes': workout.get('duration', 30),
+                'xp': 20,
+                'completed': False,
+            },
+            # Nutrition task
+            {
+                'id': f"task_{day}_nutrition",
+                'type': 'nutrition',
+                'title': 'Log Your Meals',
+                'description': get_nutrition_tip(day),
+                'xp': 5,
+                'completed': False,
+            },
+            # Mindset task
+            {
+                'id': f"task_{day}_mindset",
+                'type': 'mindset',
+                'title': mindset['title'],
+                'description': mindset['description'],
+                'xp': 5,
+                'completed': False,
+            },
         ]
-    }
     
-    pull_template = {
-        'name': 'Pull Day',
-        'description': 'Back and biceps focus',
-        'duration': 45,
-        'xp': 30,
-        'exercises': [
-            {'name': 'Pull-ups/Lat Pulldown', 'sets': 4, 'reps': '8-10'},
-            {'name': 'Barbell Rows', 'sets': 4, 'reps': '8-10'},
-            {'name': 'Face Pulls', 'sets': 3, 'reps': '15-20'},
-            {'name': 'Dumbbell Curls', 'sets': 3, 'reps': '10-12'},
-            {'name': 'Rear Delt Flyes', 'sets': 3, 'reps': '12-15'},
+    if stage_type == 'recovery':
+        return [
+            {
+                'id': f"task_{day}_stretch",
+                'type': 'stretch',
+                'title': 'Mobility Routine',
+                'description': '15-minute stretching and mobility work',
+                'duration_minutes': 15,
+                'xp': 10,
+                'completed': False,
+            },
+            {
+                'id': f"task_{day}_reflect",
+                'type': 'reflection',
+                'title': 'Weekly Reflection',
+                'description': 'Review your progress and set intentions for next week',
+                'xp': 5,
+                'completed': False,
+            },
         ]
-    }
     
-    legs_template = {
-        'name': 'Leg Day',
-        'description': 'Quadriceps, hamstrings, and glutes',
-        'duration': 50,
-        'xp': 35,
-        'exercises': [
-            {'name': 'Squats', 'sets': 4, 'reps': '8-10'},
-            {'name': 'Romanian Deadlifts', 'sets': 3, 'reps': '10-12'},
-            {'name': 'Leg Press', 'sets': 3, 'reps': '10-12'},
-            {'name': 'Walking Lunges', 'sets': 3, 'reps': '12 each'},
-            {'name': 'Calf Raises', 'sets': 4, 'reps': '15-20'},
+    if stage_type == 'assessment':
+        return [
+            {
+                'id': f"task_{day}_photos",
+                'type': 'photos',
+                'title': 'Progress Photos',
+                'description': 'Take new front and side photos to track changes',
+                'xp': 30,
+                'completed': False,
+            },
+            {
+                'id': f"task_{day}_measurements",
+                'type': 'measurements',
+                'title': 'Body Measurements',
+                'description': 'Record weight and key measurements',
+                'xp': 10,
+                'completed': False,
+            },
+            {
+                'id': f"task_{day}_review",
+                'type': 'review',
+                'title': 'AI Progress Analysis',
+                'description': 'Review your transformation with AI insights',
+                'xp': 10,
+                'completed': False,
+            },
         ]
-    }
     
-    core_posture = {
-        'name': 'Core & Posture',
-        'description': 'Core strengthening and postural correction',
-        'duration': 30,
-        'xp': 25,
-        'exercises': [
-            {'name': 'Planks', 'sets': 3, 'reps': '45-60 sec'},
-            {'name': 'Dead Bugs', 'sets': 3, 'reps': '10 each side'},
-            {'name': 'Bird Dogs', 'sets': 3, 'reps': '10 each side'},
-            {'name': 'Back Extensions', 'sets': 3, 'reps': '12-15'},
-            {'name': 'Pallof Press', 'sets': 3, 'reps': '10 each side'},
-        ]
-    }
-    
-    hiit_template = {
-        'name': 'HIIT Conditioning',
-        'description': 'High-intensity interval training for fat loss',
-        'duration': 25,
-        'xp': 30,
-        'exercises': [
-            {'name': 'Burpees', 'sets': 4, 'reps': '30 sec on/30 sec off'},
-            {'name': 'Mountain Climbers', 'sets': 4, 'reps': '30 sec on/30 sec off'},
-            {'name': 'Jump Squats', 'sets': 4, 'reps': '30 sec on/30 sec off'},
-            {'name': 'High Knees', 'sets': 4, 'reps': '30 sec on/30 sec off'},
-        ]
-    }
+    return []
+
+
+def get_workout_templates(focus_areas: List[Dict], gender: str) -> List[Dict]:
+    """Get workout templates based on focus areas."""
     
     # Add templates based on focus areas
     has_shoulder_focus = any(a['area'] in ['shoulders', 'lats'] for a in focus_areas)
     has_posture_focus = any(a['area'] == 'posture' for a in focus_areas)
     
     # Standard PPL + accessories
-    templates = [push_template, pull_template, legs_template]
+    templates = [PUSH_TEMPLATE, PULL_TEMPLATE, LEGS_TEMPLATE]
     
     if has_posture_focus:
-        templates.append(core_posture)
+        templates.append(CORE_POSTURE_TEMPLATE)
     
-    templates.append(hiit_template)
+    templates.append(HIIT_TEMPLATE)
     
     if has_shoulder_focus:
-        shoulder_focus = {
-            'name': 'Shoulder Specialization',
-            'description': 'Extra focus on building wider shoulders',
-            'duration': 40,
-            'xp': 30,
-            'exercises': [
-                {'name': 'Overhead Press', 'sets': 4, 'reps': '6-8'},
-                {'name': 'Lateral Raises', 'sets': 5, 'reps': '12-15'},
-                {'name': 'Cable Lateral Raises', 'sets': 3, 'reps': '12-15'},
-                {'name': 'Face Pulls', 'sets': 4, 'reps': '15-20'},
-                {'name': 'Upright Rows', 'sets': 3, 'reps': '10-12'},
-            ]
-        }
-        templates.append(shoulder_focus)
+        templates.append(SHOULDER_FOCUS_TEMPLATE)
     
     return templates
 
 
 def get_nutrition_tip(day: int) -> str:
     """Get a nutrition tip for the day."""
-    tips = [
-        "Focus on protein: Aim for 0.8-1g per pound of body weight",
-        "Stay hydrated: Drink at least 8 glasses of water today",
-        "Eat the rainbow: Include colorful vegetables in your meals",
-        "Time your carbs: Prioritize complex carbs around workouts",
-        "Healthy fats matter: Include avocado, nuts, or olive oil",
-        "Meal prep tip: Prepare tomorrow's meals today",
-        "Mindful eating: Put away your phone during meals",
-        "Protein timing: Have protein within 2 hours post-workout",
-        "Fiber focus: Aim for 25-35g of fiber today",
-        "Limit processed foods: Choose whole foods when possible",
-    ]
-    return tips[(day - 1) % len(tips)]
+    return NUTRITION_TIPS[(day - 1) % len(NUTRITION_TIPS)]
 
 
 def get_mindset_task(day: int) -> Dict:
     """Get a mindset/habit task for the day."""
-    tasks = [
-        {'title': 'Morning Visualization', 'description': 'Spend 5 minutes visualizing your ideal physique'},
-        {'title': 'Gratitude Journal', 'description': 'Write 3 things you appreciate about your body'},
-        {'title': 'Progress Photo', 'description': 'Take a quick mirror selfie to track changes'},
-        {'title': 'Sleep Optimization', 'description': 'Get 7-8 hours of quality sleep tonight'},
-        {'title': 'Stress Management', 'description': '10 minutes of meditation or deep breathing'},
-        {'title': 'Goal Review', 'description': 'Review your transformation goals'},
-        {'title': 'Positive Affirmations', 'description': 'Repeat 3 positive statements about your journey'},
-    ]
-    return tasks[(day - 1) % len(tasks)]
+    return MINDSET_TASKS[(day - 1) % len(MINDSET_TASKS)]
 
 
 def generate_milestones(commitment_days: int) -> List[Dict]:
     """Generate milestone achievements for the pathway."""
-    
-    milestones = [
-        {
-            'id': 'first_workout',
-            'title': '🎯 First Step',
-            'description': 'Complete your first workout',
-            'day': 1,
-            'xp_bonus': 50,
-            'achieved': False,
-        },
-        {
-            'id': 'week_1',
-            'title': '🔥 Week 1 Complete',
-            'description': 'Finish your first week',
-            'day': 7,
-            'xp_bonus': 100,
-            'achieved': False,
-        },
-    ]
-    
-    if commitment_days >= 14:
-        milestones.append({
-            'id': 'first_assessment',
-            'title': '📊 First Progress Check',
-            'description': 'Complete your first progress assessment',
-            'day': 14,
-            'xp_bonus': 150,
-            'achieved': False,
-        })
-    
-    if commitment_days >= 30:
-        milestones.append({
-            'id': 'month_1',
-            'title': '🏆 Month 1 Champion',
-            'description': 'Complete 30 days of transformation',
-            'day': 30,
-            'xp_bonus': 300,
-            'achieved': False,
-        })
-    
-    if commitment_days >= 90:
-        milestones.append({
-            'id': 'quarter',
-            'title': '💎 Quarter Master',
-            'description': 'Complete 90 days - a new habit is formed!',
-            'day': 90,
-            'xp_bonus': 500,
-            'achieved': False,
-        })
-    
-    if commitment_days >= 365:
-        milestones.append({
-            'id': 'year',
-            'title': '👑 Year of Transformation',
-            'description': 'Complete a full year of dedication',
-            'day': 365,
-            'xp_bonus': 2000,
-            'achieved': False,
-        })
-    
-    return milestones
+    count = max(ALWAYS_INCLUDED_MILESTONES, bisect.bisect_right(MILESTONE_DAYS, commitment_days))
+    # Copied per pathway so 'achieved' can be set without touching the templates
+    return [dict(m) for m in MILESTONES[:count]]
 
 
 # For future LLM integration:
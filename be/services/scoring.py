@@ -1,324 +1,490 @@
 """
 Physique Scoring Module - Rating system for body analysis
 """
+import bisect
+import hashlib
+import heapq
 import math
-from typing import List, Dict, Any
+import threading
+from operator import attrgetter
+from typing import List, Dict, Any, NamedTuple, Optional
 
+import numpy as np
+import orjson
+from cachetools import LRUCache
 
-def calculate_distance(point1: Dict[str, float], point2: Dict[str, float]) -> float:
-    """Calculate Euclidean distance between two pose landmarks"""
-    dx = point1['x'] - point2['x']
-    dy = point1['y'] - point2['y']
-    return math.sqrt(dx * dx + dy * dy)
+from utils.jit import njit
+from utils.landmarks import LANDMARK_FIELDS, Landmarks, landmarks_to_array
 
 
-def score_male_physique(
-    front_landmarks: List[Dict[str, float]],
-    side_landmarks: List[Dict[str, float]],
-    height_cm: float = None
-) -> Dict[str, Any]:
+# MediaPipe landmark indices
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+LEFT_HIP = 23
+RIGHT_HIP = 24
+LEFT_ELBOW = 13
+RIGHT_ELBOW = 14
+LEFT_WRIST = 15
+RIGHT_WRIST = 16
+NOSE = 0
+LEFT_ANKLE = 27
+RIGHT_ANKLE = 28
+
+# Front-view segments measured in one batched pass: shoulder width, hip width,
+# torso height (nose-hip), arm length (shoulder-wrist), leg length (hip-ankle)
+SEGMENT_STARTS = np.array([LEFT_SHOULDER, LEFT_HIP, NOSE, LEFT_SHOULDER, LEFT_HIP])
+SEGMENT_ENDS = np.array([RIGHT_SHOULDER, RIGHT_HIP, LEFT_HIP, LEFT_WRIST, LEFT_ANKLE])
+
+# Left/right landmark pairs whose height difference measures symmetry: shoulders, hips
+SYMMETRY_LEFT = np.array([LEFT_SHOULDER, LEFT_HIP])
+SYMMETRY_RIGHT = np.array([RIGHT_SHOULDER, RIGHT_HIP])
+
+
+# Score categories in kernel output order, with their display names; 'overall' follows them
+CATEGORIES = ('shoulders', 'v_taper', 'core', 'symmetry', 'chest', 'posture', 'arms')
+CATEGORY_NAMES = ('Shoulders', 'V-Taper', 'Core', 'Symmetry', 'Chest', 'Posture', 'Arms')
+SCORE_KEYS = CATEGORIES + ('overall',)
+
+# Strong/growth notes by (category, ladder row), as (kind, description, only_below_score)
+AREA_NOTES = {
+    ('shoulders', 0): ('strong', 'Outstanding shoulder width - exceptional frame', None),
+    ('shoulders', 1): ('strong', 'Excellent shoulder development', None),
+    ('shoulders', 3): ('growth', 'Build shoulder width with lateral raises and overhead press', None),
+    ('shoulders', 4): ('growth', 'Focus on shoulder width training - high priority', None),
+    ('v_taper', 0): ('strong', 'Elite V-taper physique - competition level', None),
+    ('v_taper', 1): ('strong', 'Strong shoulder-to-waist ratio', None),
+    ('v_taper', 3): ('growth', 'Build wider shoulders and tighter core', 65),
+    ('core', 0): ('strong', 'Exceptional core definition and leanness', None),
+    ('core', 1): ('strong', 'Well-defined midsection', None),
+    ('core', 3): ('growth', 'Focus on core training and body fat reduction', None),
+    ('symmetry', 0): ('strong', 'Perfect left-right balance', None),
+    ('symmetry', 3): ('growth', 'Include unilateral exercises to balance development', 70),
+    ('chest', 0): ('strong', 'Well-developed chest', None),
+    ('chest', 2): ('growth', 'Build chest size with bench press variations', 65),
+    ('posture', 0): ('strong', 'Excellent upright posture', None),
+    ('posture', 2): ('growth', 'Work on posture - include back strengthening exercises', 70),
+    # Arms are generally a growth area unless exceptionally developed
+    ('arms', 0): ('growth', 'Increase arm size with curls and tricep work', 75),
+}
+
+
+class _Area(NamedTuple):
+    """A strong or growth area, turned into a dict only for the top 3 returned"""
+    name: str
+    score: int
+    description: str
+
+
+# Key insight sentences by top (strength) and bottom (growth) scoring category
+KEY_INSIGHT_STRENGTHS = {
+    'shoulders': 'Your shoulders are your greatest strength - they provide an excellent foundation for an impressive physique.',
+    'v_taper': 'You have a natural V-taper that many strive for - your shoulder-to-waist ratio is exceptional.',
+    'chest': 'Your chest development is strong - continue building on this foundation.',
+    'core': 'Your core definition is excellent - this gives you a lean, athletic appearance.',
+    'symmetry': 'Your physique shows excellent symmetry - balanced development across both sides.',
+    'posture': 'Your posture is outstanding - you carry yourself with confidence and alignment.',
+    'arms': 'Your arm proportions are well-balanced with your overall frame.',
+}
+
+KEY_INSIGHT_GROWTH = {
+    'shoulders': 'Focus on shoulder width training to enhance your frame.',
+    'v_taper': 'Build wider shoulders and tighten your core to improve your V-taper.',
+    'chest': 'Prioritize chest development to add thickness to your upper body.',
+    'core': 'Core strengthening and fat loss will enhance overall definition.',
+    'symmetry': 'Include unilateral exercises to balance your development.',
+    'posture': 'Work on posture with back strengthening and mobility work.',
+    'arms': 'Add dedicated arm work to match your torso development.',
+}
+
+# Overall score weights. Terms are added in this fixed order (shoulders, v_taper, chest, core,
+# symmetry, posture, arms) so the float sum, and the truncated overall score, never changes.
+OVERALL_ORDER = np.array([CATEGORIES.index(c) for c in ('shoulders', 'v_taper', 'chest', 'core', 'symmetry', 'posture', 'arms')])
+OVERALL_WEIGHTS = np.array([0.20, 0.18, 0.15, 0.15, 0.12, 0.10, 0.10])
+
+# Body type and description by minimum overall score (must stay sorted); below the first is a beginner
+BODY_TYPE_THRESHOLDS = (55, 65, 75, 85)
+BODY_TYPES = (
+    ('Beginner', 'Great potential for improvement'),
+    ('Average', 'Solid foundation to build on'),
+    ('Above Average', 'Good muscle development'),
+    ('Athletic', 'Strong, well-developed physique'),
+    ('Elite Physique', 'Competition-level development'),
+)
+
+# Frame by minimum shoulder-to-hip ratio (must stay sorted); below the first is a narrow frame
+FRAME_THRESHOLDS = (1.15, 1.25, 1.4)
+FRAME_NAMES = ('Narrow Frame', 'Medium Frame', 'Athletic Frame', 'Wide Frame')
+
+# Shortest poses the kernel can index
+MIN_FRONT_LANDMARKS = int(max(SEGMENT_STARTS.max(), SEGMENT_ENDS.max(), SYMMETRY_LEFT.max(), SYMMETRY_RIGHT.max())) + 1
+MIN_SIDE_LANDMARKS = max(NOSE, LEFT_SHOULDER, LEFT_HIP, LEFT_ANKLE) + 1
+
+
+# Scoring ladders: rows of (cutoff, base, anchor, slope, floor, cap). The first row whose cutoff
+# test passes scores base + (x - anchor) * slope, clamped to [floor, cap]; its index is the branch.
+LADDER_GE = 0  # row applies when x >= cutoff (higher ratio is better)
+LADDER_LE = 1  # row applies when x <= cutoff (lower ratio is better)
+LADDER_LT = 2  # row applies when x < cutoff
+INF = np.inf
+
+# 1. Shoulder width relative to hips
+SHOULDER_LADDER = np.array([
+    (1.45, 85.0, 1.45, 50.0, -INF, 100.0),
+    (1.35, 75.0, 1.35, 100.0, -INF, INF),
+    (1.25, 65.0, 1.25, 100.0, -INF, INF),
+    (1.15, 55.0, 1.15, 100.0, -INF, INF),
+    (-INF, 40.0, 0.0, 10.0, 40.0, INF),
+])
+# 2. Shoulder-to-waist ratio
+V_TAPER_LADDER = np.array([
+    (1.8, 90.0, 1.8, 25.0, -INF, 100.0),
+    (1.6, 75.0, 1.6, 75.0, -INF, INF),
+    (1.4, 60.0, 1.4, 75.0, -INF, INF),
+    (-INF, 0.0, 0.0, 35.0, 45.0, INF),
+])
+# 3. Waist-to-shoulder ratio
+CORE_LADDER = np.array([
+    (0.55, 95.0, 0.55, -100.0, -INF, 100.0),
+    (0.65, 80.0, 0.65, -150.0, -INF, INF),
+    (0.75, 65.0, 0.75, -150.0, -INF, INF),
+    (INF, 100.0, 0.0, -50.0, 45.0, INF),
+])
+# 4. Mean left-right shoulder and hip height imbalance
+SYMMETRY_LADDER = np.array([
+    (0.015, 95.0, 0.015, -333.0, -INF, INF),
+    (0.03, 80.0, 0.03, -1000.0, -INF, INF),
+    (0.05, 65.0, 0.05, -750.0, -INF, INF),
+    (INF, 100.0, 0.0, -800.0, 50.0, INF),
+])
+# 5. Estimated chest width relative to torso height
+CHEST_LADDER = np.array([
+    (0.45, 85.0, 0.45, 200.0, -INF, 100.0),
+    (0.35, 65.0, 0.35, 200.0, -INF, INF),
+    (-INF, 0.0, 0.0, 180.0, 50.0, INF),
+])
+# 6. Side-view head and shoulder deviation
+POSTURE_LADDER = np.array([
+    (0.08, 90.0, 0.08, -125.0, -INF, INF),
+    (0.15, 70.0, 0.15, -285.0, -INF, INF),
+    (INF, 100.0, 0.0, -300.0, 50.0, INF),
+])
+# 7. Distance of the arm/leg ratio from the ideal 0.5
+ARMS_LADDER = np.array([
+    (INF, 100.0, 0.0, -200.0, 60.0, 85.0),
+])
+
+
+@njit(cache=True)
+def _ladder_score(x, ladder, mode):
+    """Score x on a scoring ladder, returning (score, branch)"""
+    last = len(ladder) - 1
+    for branch in range(last + 1):
+        cutoff = ladder[branch, 0]
+        if mode == LADDER_GE:
+            applies = x >= cutoff
+        elif mode == LADDER_LE:
+            applies = x <= cutoff
+        else:
+            applies = x < cutoff
+        if applies or branch == last:
+            score = ladder[branch, 1] + (x - ladder[branch, 2]) * ladder[branch, 3]
+            return max(ladder[branch, 4], min(ladder[branch, 5], score)), branch
+    return 0.0, -1
+
+
+@njit(cache=True)
+def _score_core(front, side, has_side):
     """
-    Calculate physique scores for male body (0-100 scale)
-    
-    Args:
-        front_landmarks: Front view pose landmarks
-        side_landmarks: Side view pose landmarks
-        height_cm: Optional height in centimeters for calibration
+    Numeric core of score_male_physique
     
     Returns:
-        Complete physique analysis with scores and insights
+        (scores, branches, shoulder_hip_ratio): scores in SCORE_KEYS order, and for each
+        category the index of the ladder row used (-1 for the no-side-view posture)
     """
-    scores = {}
-    insights = []
-    strong_areas = []
-    growth_areas = []
-    
-    # MediaPipe landmark indices
-    LEFT_SHOULDER = 11
-    RIGHT_SHOULDER = 12
-    LEFT_HIP = 23
-    RIGHT_HIP = 24
-    LEFT_ELBOW = 13
-    RIGHT_ELBOW = 14
-    LEFT_WRIST = 15
-    RIGHT_WRIST = 16
-    NOSE = 0
-    LEFT_ANKLE = 27
-    RIGHT_ANKLE = 28
+    scores = np.empty(len(SCORE_KEYS))
+    branches = np.empty(len(CATEGORIES), dtype=np.int64)
     
     # === FRONT VIEW ANALYSIS ===
     
-    # 1. SHOULDER SCORE (Width relative to hips)
-    shoulder_width = calculate_distance(
-        front_landmarks[LEFT_SHOULDER],
-        front_landmarks[RIGHT_SHOULDER]
-    )
-    hip_width = calculate_distance(
-        front_landmarks[LEFT_HIP],
-        front_landmarks[RIGHT_HIP]
-    )
+    # All front-view distances at once. Each segment keeps its own sqrt even though the widths
+    # only feed ratios: sqrt(a / b) differs from sqrt(a) / sqrt(b) in the last bit for about a
+    # third of inputs, which is enough to move a ratio across a ladder cutoff or change a
+    # truncated score that progression compares against earlier scans.
+    dists = np.empty(len(SEGMENT_STARTS))
+    for i in range(len(SEGMENT_STARTS)):
+        dx = front[SEGMENT_STARTS[i], 0] - front[SEGMENT_ENDS[i], 0]
+        dy = front[SEGMENT_STARTS[i], 1] - front[SEGMENT_ENDS[i], 1]
+        dists[i] = math.sqrt(dx * dx + dy * dy)
+    shoulder_width = dists[0]
+    hip_width = dists[1]
+    torso_height = dists[2]
+    arm_length = dists[3]
+    leg_length = dists[4]
     
+    # 1. SHOULDER SCORE (Width relative to hips)
     shoulder_hip_ratio = shoulder_width / hip_width if hip_width > 0 else 1.0
-    
-    if shoulder_hip_ratio >= 1.45:
-        scores['shoulders'] = min(100, 85 + (shoulder_hip_ratio - 1.45) * 50)
-        strong_areas.append({
-            'name': 'Shoulders',
-            'score': int(scores['shoulders']),
-            'description': 'Outstanding shoulder width - exceptional frame'
-        })
-    elif shoulder_hip_ratio >= 1.35:
-        scores['shoulders'] = 75 + (shoulder_hip_ratio - 1.35) * 100
-        strong_areas.append({
-            'name': 'Shoulders',
-            'score': int(scores['shoulders']),
-            'description': 'Excellent shoulder development'
-        })
-    elif shoulder_hip_ratio >= 1.25:
-        scores['shoulders'] = 65 + (shoulder_hip_ratio - 1.25) * 100
-    elif shoulder_hip_ratio >= 1.15:
-        scores['shoulders'] = 55 + (shoulder_hip_ratio - 1.15) * 100
-        growth_areas.append({
-            'name': 'Shoulders',
-            'score': int(scores['shoulders']),
-            'description': 'Build shoulder width with lateral raises and overhead press'
-        })
-    else:
-        scores['shoulders'] = max(40, 40 + shoulder_hip_ratio * 10)
-        growth_areas.append({
-            'name': 'Shoulders',
-            'score': int(scores['shoulders']),
-            'description': 'Focus on shoulder width training - high priority'
-        })
+    scores[0], branches[0] = _ladder_score(shoulder_hip_ratio, SHOULDER_LADDER, LADDER_GE)
     
     # 2. V-TAPER SCORE (Shoulder-to-waist ratio)
     # Estimate waist width (typically 0.7-0.8 of hip width)
     waist_width = hip_width * 0.75
     v_taper_ratio = shoulder_width / waist_width if waist_width > 0 else 1.0
-    
-    if v_taper_ratio >= 1.8:
-        scores['v_taper'] = min(100, 90 + (v_taper_ratio - 1.8) * 25)
-        strong_areas.append({
-            'name': 'V-Taper',
-            'score': int(scores['v_taper']),
-            'description': 'Elite V-taper physique - competition level'
-        })
-    elif v_taper_ratio >= 1.6:
-        scores['v_taper'] = 75 + (v_taper_ratio - 1.6) * 75
-        strong_areas.append({
-            'name': 'V-Taper',
-            'score': int(scores['v_taper']),
-            'description': 'Strong shoulder-to-waist ratio'
-        })
-    elif v_taper_ratio >= 1.4:
-        scores['v_taper'] = 60 + (v_taper_ratio - 1.4) * 75
-    else:
-        scores['v_taper'] = max(45, v_taper_ratio * 35)
-        if scores['v_taper'] < 65:
-            growth_areas.append({
-                'name': 'V-Taper',
-                'score': int(scores['v_taper']),
-                'description': 'Build wider shoulders and tighter core'
-            })
+    scores[1], branches[1] = _ladder_score(v_taper_ratio, V_TAPER_LADDER, LADDER_GE)
     
     # 3. CORE/WAIST SCORE (Tightness relative to frame)
     waist_shoulder_ratio = waist_width / shoulder_width if shoulder_width > 0 else 1.0
-    
-    if waist_shoulder_ratio <= 0.55:
-        scores['core'] = min(100, 95 + (0.55 - waist_shoulder_ratio) * 100)
-        strong_areas.append({
-            'name': 'Core',
-            'score': int(scores['core']),
-            'description': 'Exceptional core definition and leanness'
-        })
-    elif waist_shoulder_ratio <= 0.65:
-        scores['core'] = 80 + (0.65 - waist_shoulder_ratio) * 150
-        strong_areas.append({
-            'name': 'Core',
-            'score': int(scores['core']),
-            'description': 'Well-defined midsection'
-        })
-    elif waist_shoulder_ratio <= 0.75:
-        scores['core'] = 65 + (0.75 - waist_shoulder_ratio) * 150
-    else:
-        scores['core'] = max(45, 100 - waist_shoulder_ratio * 50)
-        growth_areas.append({
-            'name': 'Core',
-            'score': int(scores['core']),
-            'description': 'Focus on core training and body fat reduction'
-        })
+    scores[2], branches[2] = _ladder_score(waist_shoulder_ratio, CORE_LADDER, LADDER_LE)
     
     # 4. SYMMETRY SCORE
-    left_shoulder_y = front_landmarks[LEFT_SHOULDER]['y']
-    right_shoulder_y = front_landmarks[RIGHT_SHOULDER]['y']
-    left_hip_y = front_landmarks[LEFT_HIP]['y']
-    right_hip_y = front_landmarks[RIGHT_HIP]['y']
-    
-    shoulder_imbalance = abs(left_shoulder_y - right_shoulder_y)
-    hip_imbalance = abs(left_hip_y - right_hip_y)
-    total_imbalance = (shoulder_imbalance + hip_imbalance) / 2
-    
-    if total_imbalance < 0.015:
-        scores['symmetry'] = 95 + (0.015 - total_imbalance) * 333
-        strong_areas.append({
-            'name': 'Symmetry',
-            'score': int(scores['symmetry']),
-            'description': 'Perfect left-right balance'
-        })
-    elif total_imbalance < 0.03:
-        scores['symmetry'] = 80 + (0.03 - total_imbalance) * 1000
-    elif total_imbalance < 0.05:
-        scores['symmetry'] = 65 + (0.05 - total_imbalance) * 750
-    else:
-        scores['symmetry'] = max(50, 100 - total_imbalance * 800)
-        if scores['symmetry'] < 70:
-            growth_areas.append({
-                'name': 'Symmetry',
-                'score': int(scores['symmetry']),
-                'description': 'Include unilateral exercises to balance development'
-            })
+    # Mean height difference over the left/right pairs, summed in pair order
+    total_imbalance = 0.0
+    for i in range(len(SYMMETRY_LEFT)):
+        total_imbalance += abs(front[SYMMETRY_LEFT[i], 1] - front[SYMMETRY_RIGHT[i], 1])
+    total_imbalance /= len(SYMMETRY_LEFT)
+    scores[3], branches[3] = _ladder_score(total_imbalance, SYMMETRY_LADDER, LADDER_LT)
     
     # 5. CHEST SCORE (estimated from shoulder and torso proportions)
     chest_width_estimate = shoulder_width * 0.85
-    torso_height = calculate_distance(front_landmarks[NOSE], front_landmarks[LEFT_HIP])
     chest_torso_ratio = chest_width_estimate / torso_height if torso_height > 0 else 1.0
-    
-    if chest_torso_ratio >= 0.45:
-        scores['chest'] = min(100, 85 + (chest_torso_ratio - 0.45) * 200)
-        strong_areas.append({
-            'name': 'Chest',
-            'score': int(scores['chest']),
-            'description': 'Well-developed chest'
-        })
-    elif chest_torso_ratio >= 0.35:
-        scores['chest'] = 65 + (chest_torso_ratio - 0.35) * 200
-    else:
-        scores['chest'] = max(50, chest_torso_ratio * 180)
-        if scores['chest'] < 65:
-            growth_areas.append({
-                'name': 'Chest',
-                'score': int(scores['chest']),
-                'description': 'Build chest size with bench press variations'
-            })
+    scores[4], branches[4] = _ladder_score(chest_torso_ratio, CHEST_LADDER, LADDER_GE)
     
     # === SIDE VIEW ANALYSIS ===
     
     # 6. POSTURE SCORE (from side view)
     # Check alignment of head, shoulder, hip
-    if side_landmarks:
-        nose_side = side_landmarks[NOSE]
-        shoulder_side = side_landmarks[LEFT_SHOULDER]
-        hip_side = side_landmarks[LEFT_HIP]
-        ankle_side = side_landmarks[LEFT_ANKLE]
-        
+    if has_side:
         # Calculate forward head position
-        head_forward = abs(nose_side['x'] - shoulder_side['x'])
+        head_forward = abs(side[NOSE, 0] - side[LEFT_SHOULDER, 0])
         # Calculate shoulder to ankle alignment
-        vertical_alignment = abs(shoulder_side['x'] - ankle_side['x'])
+        vertical_alignment = abs(side[LEFT_SHOULDER, 0] - side[LEFT_ANKLE, 0])
         
         posture_deviation = (head_forward * 2 + vertical_alignment) / 3
-        
-        if posture_deviation < 0.08:
-            scores['posture'] = 90 + (0.08 - posture_deviation) * 125
-            strong_areas.append({
-                'name': 'Posture',
-                'score': int(scores['posture']),
-                'description': 'Excellent upright posture'
-            })
-        elif posture_deviation < 0.15:
-            scores['posture'] = 70 + (0.15 - posture_deviation) * 285
-        else:
-            scores['posture'] = max(50, 100 - posture_deviation * 300)
-            if scores['posture'] < 70:
-                growth_areas.append({
-                    'name': 'Posture',
-                    'score': int(scores['posture']),
-                    'description': 'Work on posture - include back strengthening exercises'
-                })
+        scores[5], branches[5] = _ladder_score(posture_deviation, POSTURE_LADDER, LADDER_LT)
     else:
-        scores['posture'] = 75  # Default score if no side view
+        scores[5] = 75  # Default score if no side view
+        branches[5] = -1
     
     # 7. ARM SCORE (from front view - arm length and proportion)
-    arm_length = calculate_distance(
-        front_landmarks[LEFT_SHOULDER],
-        front_landmarks[LEFT_WRIST]
-    )
-    leg_length = calculate_distance(
-        front_landmarks[LEFT_HIP],
-        front_landmarks[LEFT_ANKLE]
-    )
     arm_leg_ratio = arm_length / leg_length if leg_length > 0 else 1.0
     
     # Ideal ratio is around 0.45-0.55
-    arm_score_base = 100 - abs(arm_leg_ratio - 0.5) * 200
-    scores['arms'] = max(60, min(85, arm_score_base))
-    
-    # Arms are generally a growth area unless exceptionally developed
-    if scores['arms'] < 75:
-        growth_areas.append({
-            'name': 'Arms',
-            'score': int(scores['arms']),
-            'description': 'Increase arm size with curls and tricep work'
-        })
+    scores[6], branches[6] = _ladder_score(abs(arm_leg_ratio - 0.5), ARMS_LADDER, LADDER_GE)
     
     # === OVERALL SCORE ===
-    # Weighted average of all components
-    scores['overall'] = (
-        scores['shoulders'] * 0.20 +
-        scores['v_taper'] * 0.18 +
-        scores['chest'] * 0.15 +
-        scores['core'] * 0.15 +
-        scores['symmetry'] * 0.12 +
-        scores['posture'] * 0.10 +
-        scores['arms'] * 0.10
-    )
+    # Weighted average of all components, summed in OVERALL_ORDER
+    overall = 0.0
+    for i in range(len(OVERALL_ORDER)):
+        overall += scores[OVERALL_ORDER[i]] * OVERALL_WEIGHTS[i]
+    scores[len(CATEGORIES)] = overall
     
-    # === BODY TYPE CLASSIFICATION ===
-    if scores['overall'] >= 85:
-        body_type = 'Elite Physique'
-        body_description = 'Competition-level development'
-    elif scores['overall'] >= 75:
-        body_type = 'Athletic'
-        body_description = 'Strong, well-developed physique'
-    elif scores['overall'] >= 65:
-        body_type = 'Above Average'
-        body_description = 'Good muscle development'
-    elif scores['overall'] >= 55:
-        body_type = 'Average'
-        body_description = 'Solid foundation to build on'
+    return scores, branches, shoulder_hip_ratio
+
+
+@njit(cache=True)
+def _score_batch_core(fronts, sides, has_side):
+    """_score_core over a batch of frames, returning (scores, branches, shoulder_hip_ratios)"""
+    scores = np.empty((len(fronts), len(SCORE_KEYS)))
+    branches = np.empty((len(fronts), len(CATEGORIES)), dtype=np.int64)
+    ratios = np.empty(len(fronts))
+    for b in range(len(fronts)):
+        scores[b], branches[b], ratios[b] = _score_core(fronts[b], sides[b], has_side)
+    return scores, branches, ratios
+
+
+def warm_up_kernels():
+    """Compile (or load from the on-disk cache) the scoring kernels for the request array layout"""
+    _score_core(np.zeros((33, 4)), np.zeros((33, 4)), True)
+    _score_batch_core(np.zeros((1, 33, 4)), np.zeros((1, 33, 4)), True)
+
+
+# Batched frames whose scored front landmarks fall below this visibility get LOW_VISIBILITY_RESULT
+MIN_KEY_POINT_VISIBILITY = 0.5
+VISIBILITY_COLUMN = LANDMARK_FIELDS.index('visibility')
+LOW_VISIBILITY_RESULT = {
+    'overall_score': 0,
+    'message': 'Pose not clearly visible',
+    'confidence': 'low',
+}
+
+# Recent results by fingerprint of the coordinates the kernel reads, stored as JSON so every
+# hit decodes a private copy (the API adds baseline/progression fields to the result)
+SCORE_CACHE_SIZE = 512
+SCORED_FRONT_ROWS = np.unique(np.concatenate((SEGMENT_STARTS, SEGMENT_ENDS, SYMMETRY_LEFT, SYMMETRY_RIGHT)))
+SCORED_SIDE_ROWS = np.array([NOSE, LEFT_SHOULDER, LEFT_ANKLE])
+_score_cache: Dict[bytes, bytes] = LRUCache(maxsize=SCORE_CACHE_SIZE)
+_score_cache_lock = threading.Lock()
+
+
+def _score_cache_key(front: np.ndarray, side: np.ndarray, has_side: bool) -> Optional[bytes]:
+    """Fingerprint of the exact scored coordinates, or None when they cannot be cached"""
+    front_xy = front[SCORED_FRONT_ROWS, :2]
+    side_x = side[SCORED_SIDE_ROWS, 0] if has_side else side[:0, 0]
+    if not (np.isfinite(front_xy).all() and np.isfinite(side_x).all()):
+        # Non-finite coordinates fail scoring, and errors are not cached
+        return None
+    
+    key = hashlib.blake2b(digest_size=16)
+    key.update(b'\x01' if has_side else b'\x00')
+    key.update(np.ascontiguousarray(front_xy).tobytes())
+    key.update(np.ascontiguousarray(side_x).tobytes())
+    return key.digest()
+
+
+def score_male_physique(
+    front_landmarks: Landmarks,
+    side_landmarks: Landmarks,
+    height_cm: float = None
+) -> Dict[str, Any]:
+    """
+    Calculate physique scores for male body (0-100 scale)
+    
+    Args:
+        front_landmarks: Front view pose landmarks, (N, 4) or (N, 2) x/y array, or list of dicts
+        side_landmarks: Side view pose landmarks, (N, 4) or (N, 2) x/y array, or list of dicts
+        height_cm: Optional height in centimeters for calibration
+    
+    Returns:
+        Complete physique analysis with scores and insights
+    
+    Raises:
+        ValueError: If a pose is too short to score
+    
+    Repeated calls with the same scored coordinates (e.g. a resubmitted scan) are served
+    from a small cache; callers always get their own copy.
+    """
+    # Only x and y are read. Arrays are scored as C-ordered float64, so float32 or strided
+    # input neither loses precision nor compiles a second kernel specialization.
+    front_landmarks = np.ascontiguousarray(landmarks_to_array(front_landmarks), dtype=np.float64)
+    side_landmarks = np.ascontiguousarray(landmarks_to_array(side_landmarks), dtype=np.float64)
+    
+    # The compiled kernel does not bounds-check, so short poses are rejected here
+    if len(front_landmarks) < MIN_FRONT_LANDMARKS:
+        raise ValueError(f"Front pose needs at least {MIN_FRONT_LANDMARKS} landmarks, got {len(front_landmarks)}")
+    has_side = len(side_landmarks) > 0
+    if has_side and len(side_landmarks) < MIN_SIDE_LANDMARKS:
+        raise ValueError(f"Side pose needs at least {MIN_SIDE_LANDMARKS} landmarks, got {len(side_landmarks)}")
+    
+    key = _score_cache_key(front_landmarks, side_landmarks, has_side)
+    if key is not None:
+        with _score_cache_lock:
+            cached = _score_cache.get(key)
+        if cached is not None:
+            return orjson.loads(cached)
+    
+    analysis = _score_male_physique(front_landmarks, side_landmarks, has_side)
+    if key is not None:
+        with _score_cache_lock:
+            _score_cache[key] = orjson.dumps(analysis)
+    return analysis
+
+
+def _score_male_physique(front_landmarks: np.ndarray, side_landmarks: np.ndarray, has_side: bool) -> Dict[str, Any]:
+    """Uncached body of score_male_physique, for poses already checked to be long enough"""
+    return _build_analysis(*_score_core(front_landmarks, side_landmarks, has_side))
+
+
+def score_male_physique_batch(
+    front_batch: np.ndarray,
+    side_batch: Optional[np.ndarray] = None,
+    min_visibility: Optional[float] = MIN_KEY_POINT_VISIBILITY
+) -> List[Dict[str, Any]]:
+    """
+    Score many frames at once, e.g. consecutive frames of a live preview
+    
+    Args:
+        front_batch: (B, N, 4) or (B, N, 2) front view landmarks, one pose per frame
+        side_batch: Matching side view landmarks, or None to score without a side view
+        min_visibility: Frames whose scored front landmarks are less visible than this are
+            not scored; None scores every frame. Ignored for x/y-only batches.
+    
+    Returns:
+        One analysis per frame, identical to what score_male_physique returns for it, or a
+        low-confidence result without scores for frames that failed the visibility check
+    
+    Raises:
+        ValueError: If the batches have the wrong shape or poses are too short to score
+    """
+    fronts = np.ascontiguousarray(front_batch, dtype=np.float64)
+    if fronts.ndim != 3 or fronts.shape[2] < 2:
+        raise ValueError(f"Front batch must have shape (B, N, 2) or (B, N, 4), got {fronts.shape}")
+    if fronts.shape[1] < MIN_FRONT_LANDMARKS:
+        raise ValueError(f"Front pose needs at least {MIN_FRONT_LANDMARKS} landmarks, got {fronts.shape[1]}")
+    
+    has_side = side_batch is not None
+    if has_side:
+        sides = np.ascontiguousarray(side_batch, dtype=np.float64)
+        if sides.ndim != 3 or sides.shape[0] != fronts.shape[0] or sides.shape[2] < 2:
+            raise ValueError(f"Side batch must have shape ({fronts.shape[0]}, N, 2) or ({fronts.shape[0]}, N, 4), got {sides.shape}")
+        if sides.shape[1] < MIN_SIDE_LANDMARKS:
+            raise ValueError(f"Side pose needs at least {MIN_SIDE_LANDMARKS} landmarks, got {sides.shape[1]}")
+    else:
+        sides = np.zeros((len(fronts), 0, 2))
+    
+    # Occluded frames skip the kernel; MediaPipe still guesses coordinates for them
+    if min_visibility is not None and fronts.shape[2] > VISIBILITY_COLUMN:
+        visible = (fronts[:, SCORED_FRONT_ROWS, VISIBILITY_COLUMN] >= min_visibility).all(axis=1)
+        if not visible.all():
+            fronts = fronts[visible]
+            sides = sides[visible]
     else:
-        body_type = 'Beginner'
-        body_description = 'Great potential for improvement'
+        visible = np.ones(len(fronts), dtype=bool)
+    
+    # One compiled call for the numeric work of every scored frame
+    scores, branches, ratios = _score_batch_core(fronts, sides, has_side)
+    analyses = iter(zip(scores, branches, ratios.tolist()))
+    return [
+        _build_analysis(*next(analyses)) if is_visible else dict(LOW_VISIBILITY_RESULT)
+        for is_visible in visible.tolist()
+    ]
+
+
+def _build_analysis(score_values: np.ndarray, branches: np.ndarray, shoulder_hip_ratio: float) -> Dict[str, Any]:
+    """Turn one frame of kernel output into the analysis returned by score_male_physique"""
+    scores = dict(zip(SCORE_KEYS, score_values.tolist()))
+    # Truncated once; int() also rejects NaN scores with ValueError
+    int_scores = {k: int(v) for k, v in scores.items()}
+    
+    strong_areas = []
+    growth_areas = []
+    for category, name, branch in zip(CATEGORIES, CATEGORY_NAMES, branches.tolist()):
+        note = AREA_NOTES.get((category, branch))
+        if note is None:
+            continue
+        kind, description, only_below = note
+        if only_below is not None and scores[category] >= only_below:
+            continue
+        (strong_areas if kind == 'strong' else growth_areas).append(
+            _Area(name, int_scores[category], description)
+        )
+    
+    # === BODY TYPE CLASSIFICATION ===
+    body_type, body_description = BODY_TYPES[bisect.bisect_right(BODY_TYPE_THRESHOLDS, scores['overall'])]
     
     # === FRAME CLASSIFICATION ===
-    if shoulder_hip_ratio >= 1.4:
-        frame = 'Wide Frame'
-    elif shoulder_hip_ratio >= 1.25:
-        frame = 'Athletic Frame'
-    elif shoulder_hip_ratio >= 1.15:
-        frame = 'Medium Frame'
-    else:
-        frame = 'Narrow Frame'
+    frame = FRAME_NAMES[bisect.bisect_right(FRAME_THRESHOLDS, shoulder_hip_ratio)]
     
     # === KEY INSIGHT ===
     # Generate personalized insight based on top scores
-    top_score_category = max(scores.items(), key=lambda x: x[1] if x[0] != 'overall' else 0)[0]
-    bottom_score_category = min(scores.items(), key=lambda x: x[1] if x[0] != 'overall' else 0)[0]
+    category_scores = dict(zip(CATEGORIES, score_values.tolist()))
+    top_score_category = max(category_scores, key=category_scores.get)
+    # The original min ranked 'overall' as 0 and every category score is floored well above
+    # that, so the bottom category has always been 'overall' (the generic growth line)
+    bottom_score_category = 'overall'
     
     insight = generate_key_insight(top_score_category, bottom_score_category, scores, body_type)
     
-    # Sort and limit strong/growth areas
-    strong_areas.sort(key=lambda x: x['score'], reverse=True)
-    growth_areas.sort(key=lambda x: x['score'])
+    # Keep the top 3 strong and bottom 3 growth areas (ties keep category order)
+    strong_areas = heapq.nlargest(3, strong_areas, key=attrgetter('score'))
+    growth_areas = heapq.nsmallest(3, growth_areas, key=attrgetter('score'))
     
     return {
-        'overall_score': int(scores['overall']),
-        'scores': {k: int(v) for k, v in scores.items()},
+        'overall_score': int_scores['overall'],
+        'scores': int_scores,
         'body_type': body_type,
         'body_description': body_description,
         'frame': frame,
-        'strong_areas': strong_areas[:3],  # Top 3
-        'growth_areas': growth_areas[:3],  # Bottom 3
+        'strong_areas': [area._asdict() for area in strong_areas],
+        'growth_areas': [area._asdict() for area in growth_areas],
         'key_insight': insight,
     }
 
@@ -330,45 +496,20 @@ def generate_key_insight(
     body_type: str
 ) -> str:
     """Generate personalized insight based on scores"""
+    insight = KEY_INSIGHTS.get((top_category, bottom_category))
+    if insight is not None:
+        return insight
     
-    insights_map = {
-        'shoulders': 'Your shoulders are your greatest strength - they provide an excellent foundation for an impressive physique.',
-        'v_taper': 'You have a natural V-taper that many strive for - your shoulder-to-waist ratio is exceptional.',
-        'chest': 'Your chest development is strong - continue building on this foundation.',
-        'core': 'Your core definition is excellent - this gives you a lean, athletic appearance.',
-        'symmetry': 'Your physique shows excellent symmetry - balanced development across both sides.',
-        'posture': 'Your posture is outstanding - you carry yourself with confidence and alignment.',
-        'arms': 'Your arm proportions are well-balanced with your overall frame.',
-    }
-    
-    growth_map = {
-        'shoulders': 'Focus on shoulder width training to enhance your frame.',
-        'v_taper': 'Build wider shoulders and tighten your core to improve your V-taper.',
-        'chest': 'Prioritize chest development to add thickness to your upper body.',
-        'core': 'Core strengthening and fat loss will enhance overall definition.',
-        'symmetry': 'Include unilateral exercises to balance your development.',
-        'posture': 'Work on posture with back strengthening and mobility work.',
-        'arms': 'Add dedicated arm work to match your torso development.',
-    }
-    
-    strength_part = insights_map.get(top_category, 'You have good overall development.')
-    growth_part = growth_map.get(bottom_category, 'Keep working consistently on all muscle groups.')
-    
-    return f"{strength_part} {growth_part}"
+    return _format_key_insight(top_category, bottom_category)
 
 
-def score_female_physique(front_landmarks, side_landmarks, height_cm=None):
-    """Placeholder for female physique scoring - to be implemented"""
-    return {
-        'overall_score': 0,
-        'message': 'Female physique analysis coming soon!'
-    }
-
+def _format_key_insight(top_category: str, bottom_category: str) -> str:
+    """Join the strength and growth sentences for a top/bottom category pair"""
+    strength_part = KEY_INSIGHT_STRENGTHS.get(top_category, 'You have good overall development.')
+    growth_part = KEY_INSIGHT_GROWTH.get(bottom_category, 'Keep working consistently on all muscle groups.')
+    
+    return f"{strength_part} {growth_part}"
 
-def score_non_binary_physique(front_landmarks, side_landmarks, height_cm=None):
-    """Placeholder for non-binary physique scoring - to be implemented"""
-    return {
-        'overall_score': 0,
-        'message': 'Non-binary physique analysis coming soon!'
-    }
 
+# Every insight score_male_physique can produce, by (top category, bottom category)
+KEY_INSIGHTS = {(top, bottom): _format_key_insight(top, bottom) for top in CATEGORIES for bottom in SCORE_KEYS}
@@ -0,0 +1,21 @@
+"""
+Placeholder Physique Scoring
+Stand-ins for the scoring systems that are not built yet, kept out of the scoring module
+"""
+
+
+def score_female_physique(front_landmarks, side_landmarks, height_cm=None):
+    """Placeholder for female physique scoring - to be implemented"""
+    return {
+        'overall_score': 0,
+        'message': 'Female physique analysis coming soon!'
+    }
+
+
+def score_non_binary_physique(front_landmarks, side_landmarks, height_cm=None):
+    """Placeholder for non-binary physique scoring - to be implemented"""
+    return {
+        'overall_score': 0,
+        'message': 'Non-binary physique analysis coming soon!'
+    }
+
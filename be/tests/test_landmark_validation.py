@@ -0,0 +1,56 @@
+"""
+Landmark request validation tests
+"""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.dependencies import get_db
+from main import app
+
+
+POSE = [{'x': 0.5, 'y': 0.5, 'z': 0.0, 'visibility': 0.9} for _ in range(33)]
+
+
+@pytest.fixture
+def client():
+    # Validation fails before any handler runs, so no database or lifespan is needed
+    app.dependency_overrides[get_db] = lambda: None
+    yield TestClient(app, raise_server_exceptions=False)
+    app.dependency_overrides.clear()
+
+
+def pose_with(value):
+    pose = [dict(lm) for lm in POSE]
+    pose[11]['x'] = value
+    return pose
+
+
+def post_json(client, url, body):
+    # json.dumps writes NaN/Infinity literals, which the API's JSON parser accepts
+    return client.post(url, content=json.dumps(body), headers={'content-type': 'application/json'})
+
+
+@pytest.mark.parametrize('value', [float('nan'), float('inf'), float('-inf')])
+def test_analyze_physique_rejects_non_finite_landmarks(client, value):
+    response = post_json(client, '/api/analyze-physique', {
+        'frontPose': pose_with(value),
+        'sidePose': POSE,
+        'gender': 'male',
+    })
+
+    assert response.status_code == 422
+    detail = response.json()['detail']
+    assert detail[0]['loc'] == ['body', 'frontPose']
+    assert 'finite' in detail[0]['msg']
+
+
+def test_generate_pathway_rejects_non_finite_landmarks(client):
+    response = post_json(client, '/api/pathway/generate-pathway', {
+        'front_pose': POSE,
+        'side_pose': pose_with(float('nan')),
+    })
+
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['loc'] == ['body', 'side_pose']
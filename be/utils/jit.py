@@ -0,0 +1,18 @@
+"""
+JIT Compilation Helpers
+Exposes numba's njit when installed, otherwise a no-op decorator so kernels run as plain Python
+"""
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Fallback decorator that returns the function unchanged"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
@@ -0,0 +1,103 @@
+"""
+Landmark Array Utilities
+Converts MediaPipe pose landmarks between list-of-dict and ndarray layouts
+"""
+from typing import Annotated, List, Dict, Union
+
+import numpy as np
+from pydantic import PlainValidator, TypeAdapter, WithJsonSchema
+# Pydantic needs typing_extensions.TypedDict on Python < 3.12
+from typing_extensions import TypedDict
+
+
+# Column order of a landmark array row
+LANDMARK_FIELDS = ('x', 'y', 'z', 'visibility')
+
+# Packed storage format: little-endian float32 rows of LANDMARK_FIELDS
+BLOB_DTYPE = np.dtype('<f4')
+
+
+class PoseLandmark(TypedDict):
+    """One MediaPipe pose landmark as sent by the client, validated as a plain dict"""
+    x: float
+    y: float
+    z: float
+    visibility: float
+
+
+Landmarks = Union[np.ndarray, List[Dict[str, float]]]
+
+
+def landmarks_to_array(landmarks: Landmarks) -> np.ndarray:
+    """
+    Convert pose landmarks to an (N, 4) array of x, y, z, visibility
+
+    Args:
+        landmarks: ndarray (returned as-is) or list of landmark dicts
+
+    Returns:
+        Landmark array with one row per landmark
+    """
+    if isinstance(landmarks, np.ndarray):
+        return landmarks
+
+    try:
+        arr = np.asarray(
+            [(lm['x'], lm['y'], lm.get('z', 0.0), lm.get('visibility', 0.0)) for lm in landmarks],
+            dtype=np.float64
+        )
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Invalid landmark data: {e}")
+
+    return arr.reshape(-1, len(LANDMARK_FIELDS))
+
+
+def landmarks_to_dicts(landmarks: Landmarks) -> List[Dict[str, float]]:
+    """Convert a landmark array back to a list of landmark dicts"""
+    if not isinstance(landmarks, np.ndarray):
+        return list(landmarks)
+    return [dict(zip(LANDMARK_FIELDS, row)) for row in landmarks.tolist()]
+
+
+def landmarks_to_blob(landmarks: Landmarks) -> bytes:
+    """Pack landmarks into float32 bytes for BLOB storage"""
+    return landmarks_to_array(landmarks).astype(BLOB_DTYPE).tobytes()
+
+
+def landmarks_from_blob(blob: bytes) -> np.ndarray:
+    """Unpack a landmark BLOB into a read-only (N, 4) float32 array"""
+    return np.frombuffer(blob, dtype=BLOB_DTYPE).reshape(-1, len(LANDMARK_FIELDS))
+
+
+def parse_landmarks(value) -> np.ndarray:
+    """
+    Validate a request landmark list in one pass
+
+    Every landmark must provide x, y, z and visibility, and all values must be finite.
+    """
+    if isinstance(value, np.ndarray):
+        arr = value
+    else:
+        try:
+            arr = np.asarray(
+                [(lm['x'], lm['y'], lm['z'], lm['visibility']) for lm in value],
+                dtype=np.float64
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Each landmark needs numeric x, y, z and visibility: {e}")
+        arr = arr.reshape(-1, len(LANDMARK_FIELDS))
+
+    if arr.ndim != 2 or arr.shape[1] != len(LANDMARK_FIELDS):
+        raise ValueError(f"Landmarks must have shape (N, 4), got {arr.shape}")
+    if not np.isfinite(arr).all():
+        raise ValueError("Landmark coordinates must be finite numbers")
+
+    return arr
+
+
+# Request field type: a landmark list validated once and stored as an (N, 4) array
+LandmarkArray = Annotated[
+    np.ndarray,
+    PlainValidator(parse_landmarks),
+    WithJsonSchema({'type': 'array', 'items': TypeAdapter(PoseLandmark).json_schema()}),
+]